@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 import re
 import shutil
 import subprocess
@@ -11,15 +12,22 @@ import click
 
 from .core.registry import RepoNotGitError, RepoRegistry, UnknownRepoError
 
+# All Anthropic tokens start with this prefix.
+_TOKEN_PREFIX = "sk-ant-"
+
 # Token pattern: sk-ant- followed by base64url chars and hyphens.
-_TOKEN_RE = re.compile(r"sk-ant-[A-Za-z0-9_-]+")
+_TOKEN_RE = re.compile(re.escape(_TOKEN_PREFIX) + r"[A-Za-z0-9_-]+")
 
-# A continuation line consists entirely of base64url token characters.
-_TOKEN_CONTINUATION_RE = re.compile(r"^[A-Za-z0-9_+/=-]+$")
+# A continuation line consists entirely of base64url token characters
+# (matched with fullmatch, so no anchors are needed).
+_TOKEN_CONTINUATION_RE = re.compile(r"[A-Za-z0-9_+/=-]+")
 
 # ANSI escape sequences (colors, cursor movement, etc.)
 _ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
 
+# The line boundaries str.splitlines() recognizes, for walking lines in place.
+_LINE_BREAK_RE = re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
 
 def _extract_token(output: str) -> str | None:
     """Extract an Anthropic API token from noisy CLI output.
@@ -27,37 +35,42 @@ def _extract_token(output: str) -> str | None:
     Handles tokens that may be line-wrapped across multiple lines.
     Tokens start with ``sk-ant-`` and contain ``[A-Za-z0-9_-]``.
     """
-    # Strip ANSI escape codes (claude CLI uses colors)
-    output = _ANSI_RE.sub("", output)
-    lines = output.splitlines()
-    token_parts: list[str] = []
-    collecting = False
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            # Blank lines: skip while collecting, otherwise ignore
-            continue
-
-        if not collecting:
-            match = _TOKEN_RE.search(stripped)
-            if match:
-                token_parts.append(match.group(0))
-                # If the match extends to end-of-line, the token may
-                # continue on the next line.
-                if match.end() == len(stripped):
-                    collecting = True
-                else:
-                    break
-        else:
+    # Strip ANSI escape codes (claude CLI uses colors); most output has none
+    if "\x1b" in output:
+        output = _ANSI_RE.sub("", output)
+
+    # Token characters never include a line break, so the first match in the
+    # whole output lies on the first line that has one.
+    match = _TOKEN_RE.search(output)
+    if match is None:
+        return None
+    token_parts = [match.group(0)]
+
+    # Walk the rest line by line without splitting the output. The rest of
+    # the token's own line must be blank for the token to continue.
+    pos = match.end()
+    on_token_line = True
+    while True:
+        line_break = _LINE_BREAK_RE.search(output, pos)
+        end = line_break.start() if line_break else len(output)
+        stripped = output[pos:end].strip()
+        if stripped:
             # Accept continuation lines that are purely token characters,
             # but stop if the line starts a new token.
-            if _TOKEN_CONTINUATION_RE.match(stripped) and not stripped.startswith("sk-ant-"):
-                token_parts.append(stripped)
-            else:
+            if (
+                on_token_line
+                or not _TOKEN_CONTINUATION_RE.fullmatch(stripped)
+                or stripped.startswith(_TOKEN_PREFIX)
+            ):
                 break
+            token_parts.append(stripped)
+        # Blank lines are skipped
+        on_token_line = False
+        if line_break is None:
+            break
+        pos = line_break.end()
 
-    return "".join(token_parts) if token_parts else None
+    return "".join(token_parts)
 
 
 @click.group()
@@ -143,8 +156,14 @@ def setup_token():
     token_dir = Path.home() / ".microvm-orchestrator"
     token_dir.mkdir(parents=True, exist_ok=True)
     token_file = token_dir / "token"
-    token_file.write_text(token + "\n")
-    token_file.chmod(0o600)
+    # Create the file as 0o600 so the token is never readable at the default
+    # umask; fchmod also tightens a pre-existing file from an earlier run.
+    fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.fchmod(fd, 0o600)
+        os.write(fd, (token + "\n").encode())
+    finally:
+        os.close(fd)
 
     click.echo(f"Token saved to {token_file}")
 
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import asyncio
 import threading
+import time
 from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
@@ -16,7 +18,7 @@ class EventType(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TaskEvent:
     """Event emitted when a task completes or fails."""
 
@@ -51,6 +53,8 @@ class EventQueue:
     def __init__(self):
         self._queue: deque[TaskEvent] = deque()
         self._lock = threading.Lock()
+        # Wakes synchronous wait() callers; shares _lock with _try_pop
+        self._not_empty = threading.Condition(self._lock)
         # Track the asyncio loop and event for cross-thread signaling
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._async_event: Optional[asyncio.Event] = None
@@ -64,9 +68,24 @@ class EventQueue:
 
     def emit(self, event: TaskEvent) -> None:
         """Add event to queue (thread-safe, called from VM threads)."""
-        with self._lock:
+        with self._not_empty:
             self._queue.append(event)
+            self._not_empty.notify()
+
+        self._signal_async()
+
+    def emit_many(self, events: Sequence[TaskEvent]) -> None:
+        """Add several events at once, in order, under a single lock."""
+        if not events:
+            return
+        with self._not_empty:
+            self._queue.extend(events)
+            self._not_empty.notify(len(events))
+
+        self._signal_async()
 
+    def _signal_async(self) -> None:
+        """Wake async waiters after an emit."""
         # Signal async waiters if there's an active loop
         if self._loop is not None and self._async_event is not None:
             try:
@@ -82,26 +101,27 @@ class EventQueue:
                 return self._queue.popleft()
             return None
 
+    def __len__(self) -> int:
+        """Number of queued events (a snapshot when other threads emit)."""
+        return len(self._queue)
+
+    def drain(self) -> list[TaskEvent]:
+        """Remove and return all queued events in FIFO order (thread-safe)."""
+        with self._lock:
+            events, self._queue = self._queue, deque()
+        return list(events)
+
     def wait(self, timeout_ms: int = 30000) -> Optional[TaskEvent]:
         """
         Wait for the next event (synchronous, for tests).
 
         Returns the next event in FIFO order, or None on timeout.
         """
-        import time
-        timeout_sec = timeout_ms / 1000.0
-        end_time = time.monotonic() + timeout_sec
-
-        while True:
-            if event := self._try_pop():
-                return event
-
-            remaining = end_time - time.monotonic()
-            if remaining <= 0:
+        with self._not_empty:
+            # Woken by emit() as soon as an event arrives
+            if not self._not_empty.wait_for(lambda: self._queue, timeout_ms / 1000.0):
                 return None
-
-            # Poll every 10ms
-            time.sleep(min(0.01, remaining))
+            return self._queue.popleft()
 
     async def wait_async(self, timeout_ms: int = 30000) -> Optional[TaskEvent]:
         """
@@ -112,16 +132,18 @@ class EventQueue:
 
         Returns the next event in FIFO order, or None on timeout.
         """
+        # Fast paths: an event is already queued, or there is no time to wait
+        if event := self._try_pop():
+            return event
+        if timeout_ms <= 0:
+            return None
+
         loop = asyncio.get_running_loop()
         async_event = self._get_async_event(loop)
         timeout_sec = timeout_ms / 1000.0
 
-        # Check if there's already an event
-        if event := self._try_pop():
-            return event
-
-        # Wait for an event with timeout, checking periodically
-        # Use short waits to allow checking the queue and handling cancellation
+        # Sleep on the asyncio.Event that emit() sets; each wakeup re-checks
+        # the queue, since another waiter may have taken the event first
         end_time = loop.time() + timeout_sec
 
         while True:
@@ -137,19 +159,10 @@ class EventQueue:
                 return event
 
             try:
-                # Wait for signal or timeout (whichever comes first)
-                await asyncio.wait_for(async_event.wait(), timeout=min(remaining, 1.0))
+                await asyncio.wait_for(async_event.wait(), timeout=remaining)
             except asyncio.TimeoutError:
-                # Check if we have an event anyway
-                if event := self._try_pop():
-                    return event
-                # Continue waiting if we haven't hit total timeout
-                continue
-
-            # Got signaled, try to pop
-            if event := self._try_pop():
-                return event
-            # Spurious wakeup, continue waiting
+                # An emit may have raced the timeout
+                return self._try_pop()
 
     def create_completed_event(
         self,
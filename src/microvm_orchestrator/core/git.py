@@ -5,26 +5,22 @@ from __future__ import annotations
 import asyncio
 import json
 import subprocess
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MergeResult:
     """Result of merging task commits back to original repo."""
 
     merged: bool
     method: Optional[str] = None  # "fast-forward", "rebase", "none"
     commits: int = 0
-    conflicts: list[str] = None
+    conflicts: list[str] = field(default_factory=list)
     reason: Optional[str] = None  # "conflicts", "fetch_failed"
     task_ref: Optional[str] = None
 
-    def __post_init__(self):
-        if self.conflicts is None:
-            self.conflicts = []
-
     def to_dict(self) -> dict:
         return {
             "merged": self.merged,
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -46,6 +49,9 @@ class RepoRegistry:
     registry_path: Path = field(default_factory=_default_registry_path)
     _repos: dict[str, dict] = field(default_factory=dict, repr=False)
     _loaded: bool = field(default=False, repr=False)
+    # Open batch() blocks, and whether one of them skipped a write
+    _batch_depth: int = field(default=0, repr=False)
+    _batch_dirty: bool = field(default=False, repr=False)
 
     def __post_init__(self):
         self._load()
@@ -69,11 +75,47 @@ class RepoRegistry:
         self._loaded = True
 
     def _persist(self) -> None:
-        """Save registry to disk."""
+        """Save registry to disk (deferred while a batch() is open)."""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+
+        # Skip the write when the file on disk already holds these bytes
+        data = json.dumps(self._repos, indent=2)
+        try:
+            if self.registry_path.read_text() == data:
+                return
+        except OSError:
+            pass
+
+        # Write a sibling temp file and rename it over the registry, so
+        # readers never see a partially written file. The rename targets the
+        # resolved path so a symlinked registry keeps its link.
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
-        self.registry_path.write_text(json.dumps(self._repos, indent=2))
+        target = self.registry_path.resolve()
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(data)
+        os.replace(tmp_path, target)
         logger.debug("Persisted %d repos to registry", len(self._repos))
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group several allow()/remove() calls into a single write.
+
+        Changes are applied in memory immediately; the registry file is
+        written once when the outermost batch exits (even on error), and
+        only if something changed.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_dirty:
+                self._batch_dirty = False
+                self._persist()
+
     def allow(self, path: Path, alias: Optional[str] = None) -> str:
         """
         Register a repo in the allowlist.
@@ -272,13 +272,13 @@ class Orchestrator:
             Task information including status, result, etc.
         """
         task = self._get_task(task_id)
+        result = task.get_result()
 
         # Derive status from actual process state
         if task_id in self._processes:
             status = "running"
         else:
             # No process - task is done, check result to determine success/failure
-            result = task.get_result()
             if result and result.get("success"):
                 status = "completed"
             else:
@@ -300,7 +300,7 @@ class Orchestrator:
         }
 
         # Include results if available
-        if result := task.get_result():
+        if result:
             info["result"] = result
 
         if merge_result := task.get_merge_result():
@@ -404,18 +404,35 @@ class Orchestrator:
         if task_id in self._tasks:
             return self._tasks[task_id]
 
-        # In single-instance mode, we need to search all registered repos for the task
-        # Try all registered repos to find the task
-        for alias, info in self.registry.list().items():
-            repo_path = Path(info["path"])
-            task_dir = repo_path / ".microvm" / "tasks" / task_id
-            if task_dir.exists():
-                task = Task.load(task_dir)
-                self._tasks[task_id] = task
-                return task
+        if task := self._get_tasks([task_id]).get(task_id):
+            return task
 
         raise ToolError(f"Task not found: {task_id}")
 
+    def _get_tasks(self, task_ids: list[str]) -> dict[str, Task]:
+        """Get several tasks by ID, loading misses from disk in one pass.
+
+        Tasks not found in memory or in any registered repo are left out of
+        the returned dict.
+        """
+        tasks = {task_id: self._tasks[task_id] for task_id in task_ids if task_id in self._tasks}
+        missing = [task_id for task_id in task_ids if task_id not in tasks]
+
+        # In single-instance mode, we need to search all registered repos for the task
+        for info in self.registry.list().values():
+            if not missing:
+                break
+            tasks_dir = Path(info["path"]) / ".microvm" / "tasks"
+            for task_id in list(missing):
+                task_dir = tasks_dir / task_id
+                if task_dir.exists():
+                    task = Task.load(task_dir)
+                    self._tasks[task_id] = task
+                    tasks[task_id] = task
+                    missing.remove(task_id)
+
+        return tasks
+
     def list_tasks(self) -> list[dict[str, Any]]:
         """List all tasks across all registered repos (for debugging)."""
         tasks = []
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import subprocess
 import threading
 from datetime import datetime, timezone
@@ -18,6 +19,7 @@ from microvm_orchestrator.core.git import MergeResult
 from microvm_orchestrator.tools import Orchestrator
 
 from .fixtures.mocks import (
+    MockCompletedProcess,
     SubprocessMock,
     PopenMock,
     PTYMock,
@@ -29,8 +31,28 @@ from .fixtures.mocks import (
 # Pytest Configuration
 # =============================================================================
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register custom command-line options."""
+    parser.addoption(
+        "--nix-eval-cache",
+        action="store_true",
+        default=False,
+        help="skip nix-instantiate if the same inputs and nix version passed before",
+    )
+
+
 def pytest_configure(config: pytest.Config) -> None:
-    """Register custom markers."""
+    """Register custom markers and put tmp_path on tmpfs where available."""
+    # Registry/slot JSON is rewritten on every allow/remove/acquire; keep
+    # tmp_path off the disk. pytest still creates its usual per-user,
+    # numbered (and rotated) run dirs under this root, so concurrent runs
+    # don't collide. --basetemp or an explicit root take precedence.
+    temproot = os.environ.get("MICROVM_TEST_TMP") or (
+        "/dev/shm" if os.path.isdir("/dev/shm") else None
+    )
+    if temproot and config.option.basetemp is None:
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", temproot)
+
     config.addinivalue_line(
         "markers", "integration: marks tests as integration tests (may be slow)"
     )
@@ -209,27 +231,24 @@ def subprocess_mock() -> Generator[SubprocessMock, None, None]:
         yield mock
 
 
+# Static responses for the git commands most tests touch. MockCompletedProcess
+# is frozen, so these instances are shared safely across tests.
+_GIT_DEFAULT_RESPONSES: dict[tuple[str, ...], MockCompletedProcess] = {
+    key: MockCompletedProcess(args=key, stdout=stdout)
+    for key, stdout in (
+        (("git", "rev-parse", "HEAD"), "abc123def456\n"),
+        (("git", "symbolic-ref", "--short", "HEAD"), "main\n"),
+        (("git", "init", "--quiet"), ""),
+        (("git", "remote", "add", "origin"), ""),
+        (("git", "fetch", "origin", "--quiet"), ""),
+    )
+}
+
+
 @pytest.fixture
 def git_mock(subprocess_mock: SubprocessMock) -> SubprocessMock:
     """SubprocessMock preconfigured with common git responses."""
-    # Configure common git command responses
-    subprocess_mock.set_git_response(
-        ["rev-parse", "HEAD"],
-        stdout="abc123def456\n",
-    )
-    subprocess_mock.set_git_response(
-        ["symbolic-ref", "--short", "HEAD"],
-        stdout="main\n",
-    )
-    subprocess_mock.set_git_response(
-        ["init", "--quiet"],
-    )
-    subprocess_mock.set_git_response(
-        ["remote", "add", "origin"],
-    )
-    subprocess_mock.set_git_response(
-        ["fetch", "origin", "--quiet"],
-    )
+    subprocess_mock.set_responses(_GIT_DEFAULT_RESPONSES)
     # Default success for other git commands
     subprocess_mock.set_default(returncode=0)
     return subprocess_mock
@@ -240,9 +259,11 @@ def git_mock(subprocess_mock: SubprocessMock) -> SubprocessMock:
 # =============================================================================
 
 @pytest.fixture
-def pty_mock() -> PTYMock:
+def pty_mock() -> Generator[PTYMock, None, None]:
     """Create a PTYMock for VM process tests."""
-    return PTYMock(output_data=b"VM boot log output\n")
+    mock = PTYMock(output_data=b"VM boot log output\n")
+    yield mock
+    mock.close_all()
 
 
 @pytest.fixture
@@ -253,12 +274,14 @@ def popen_mock() -> PopenMock:
 
 @pytest.fixture
 def mock_vm_start(popen_mock: PopenMock, pty_mock: PTYMock):
-    """Mock all dependencies needed for VMProcess.start()."""
+    """Mock all dependencies needed for VMProcess.start().
+
+    The PTY fds are real, so select/read go through the kernel; os.close is
+    only routed through the mock to keep track of what has been closed.
+    """
     with patch("subprocess.Popen", return_value=popen_mock) as mock_popen, \
          patch("pty.openpty", pty_mock.openpty), \
-         patch("os.read", pty_mock.read), \
-         patch("os.close", pty_mock.close), \
-         patch("select.select", pty_mock.select):
+         patch("os.close", pty_mock.close):
         yield {
             "popen": mock_popen,
             "pty": pty_mock,
@@ -310,8 +333,13 @@ def event_loop():
 
 @pytest.fixture
 def mock_orchestrator_env(tmp_project: Path, monkeypatch: pytest.MonkeyPatch):
-    """Set up environment for Orchestrator tests."""
-    # Set API key
+    """Set up environment for Orchestrator tests.
+
+    Configuration is applied in-memory via monkeypatch; nothing is written
+    to disk beyond the ``tmp_project`` repo itself.
+    """
+    # Set API key; drop any real OAuth token so this key is the one used
+    monkeypatch.delenv("CLAUDE_CODE_OAUTH_TOKEN", raising=False)
     monkeypatch.setenv("ANTHROPIC_API_KEY", "test-api-key")
 
     return tmp_project
@@ -379,33 +407,41 @@ def orchestrator(tmp_project: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPa
 
 @pytest.fixture
 def real_git_repo(tmp_path: Path) -> Path:
-    """Create a real git repository for integration tests."""
+    """Create a real git repository for integration tests.
+
+    Git output is never inspected here, so it is discarded via DEVNULL
+    instead of being piped back into Python. GIT_DIR/GIT_WORK_TREE point
+    git straight at the repo (no upward .git discovery per call), and the
+    global/system config is ignored so the fixture is hermetic.
+    """
     repo = tmp_path / "real-repo"
     repo.mkdir()
+    env = {
+        **os.environ,
+        "GIT_DIR": str(repo / ".git"),
+        "GIT_WORK_TREE": str(repo),
+        "GIT_CONFIG_GLOBAL": os.devnull,
+        "GIT_CONFIG_SYSTEM": os.devnull,
+    }
+
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", *args],
+            cwd=repo,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
 
     # Initialize real git repo
-    subprocess.run(["git", "init"], cwd=repo, check=True, capture_output=True)
-    subprocess.run(
-        ["git", "config", "user.email", "test@test.com"],
-        cwd=repo,
-        check=True,
-        capture_output=True,
-    )
-    subprocess.run(
-        ["git", "config", "user.name", "Test"],
-        cwd=repo,
-        check=True,
-        capture_output=True,
-    )
+    git("init")
+    git("config", "user.email", "test@test.com")
+    git("config", "user.name", "Test")
 
     # Create initial commit
     (repo / "README.md").write_text("# Test Repo\n")
-    subprocess.run(["git", "add", "."], cwd=repo, check=True, capture_output=True)
-    subprocess.run(
-        ["git", "commit", "-m", "Initial commit"],
-        cwd=repo,
-        check=True,
-        capture_output=True,
-    )
+    git("add", ".")
+    git("commit", "-m", "Initial commit")
 
     return repo
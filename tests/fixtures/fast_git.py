@@ -0,0 +1,69 @@
+"""Build throwaway git repos for integration tests with few git processes."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+from pathlib import Path
+
+# Keep user/system config (hooks, templates, signing) out of fixture repos
+_GIT_ENV = {
+    **os.environ,
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_SYSTEM": os.devnull,
+}
+
+
+def _git(args: list[str], cwd: Path, stdin: bytes | None = None) -> None:
+    subprocess.run(
+        ["git", *args],
+        input=stdin,
+        cwd=cwd,
+        env=_GIT_ENV,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def init_repo(
+    path: Path,
+    files: dict[str, str | bytes],
+    *,
+    name: str,
+    email: str,
+    message: str = "Initial commit",
+) -> None:
+    """Turn ``path`` into a git repo on ``main`` with one commit of ``files``.
+
+    ``files`` maps repo-relative names to their content; ``bytes`` values are
+    written as-is, ``str`` values are UTF-8 encoded first.
+
+    The commit is written with one ``git fast-import`` stream instead of
+    separate config/add/commit processes, and the identity is appended to
+    ``.git/config`` directly. ``git reset`` then brings the index in line
+    with the checked-out files, so three git processes run in total.
+    """
+    _git(["init", "--initial-branch=main"], path)
+    # Identity for any later commits/merges in this repo (same as git config)
+    with open(path / ".git" / "config", "a") as config:
+        config.write(f"[user]\n\temail = {email}\n\tname = {name}\n")
+
+    msg = f"{message}\n".encode()
+    stamp = f"{name} <{email}> {int(time.time())} +0000\n".encode()
+    stream = [
+        b"commit refs/heads/main\n",
+        b"author " + stamp,
+        b"committer " + stamp,
+        b"data %d\n" % len(msg), msg,
+    ]
+    for rel, content in files.items():
+        data = content if isinstance(content, bytes) else content.encode()
+        (path / rel).write_bytes(data)
+        stream += [
+            b"M 100644 inline %s\n" % rel.encode(),
+            b"data %d\n" % len(data), data, b"\n",
+        ]
+    _git(["fast-import", "--quiet"], path, stdin=b"".join(stream))
+    _git(["reset", "--quiet"], path)
@@ -0,0 +1,86 @@
+"""Test helpers that are not mocks: call capture, log tails, tree cleanup."""
+
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from unittest.mock import DEFAULT, MagicMock
+
+
+def capture_calls(mock: MagicMock) -> list[tuple[tuple, dict]]:
+    """Record each call to mock as (args, kwargs) in the returned list.
+
+    Assertions can index the plain list instead of going through
+    call_args. The mock's return_value still applies.
+    """
+    captured: list[tuple[tuple, dict]] = []
+
+    def record(*args: Any, **kwargs: Any) -> Any:
+        captured.append((args, kwargs))
+        return DEFAULT
+
+    mock.side_effect = record
+    return captured
+
+
+def read_tail(path: Path | str, n: int) -> str:
+    """Return roughly the last ``n`` bytes of a file, decoded leniently.
+
+    Seeks from the end so a large VM log is never read in full.
+    """
+    with open(path, "rb") as f:
+        try:
+            f.seek(-n, os.SEEK_END)
+        except OSError:
+            # File is shorter than n bytes
+            pass
+        return f.read().decode("utf-8", errors="replace")
+
+
+def sample_tree(root: Path | str, limit: int = 200) -> list[str]:
+    """List up to ``limit`` files under ``root``, relative to it, breadth-first.
+
+    For failure messages: skips .git and never follows symlinks (such as
+    nix ``result`` links), so a task tree full of store paths stays cheap.
+    """
+    files: list[str] = []
+    pending = deque([(str(root), "")])
+    while pending and len(files) < limit:
+        directory, prefix = pending.popleft()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name == ".git" or entry.is_symlink():
+                    continue
+                if entry.is_dir():
+                    pending.append((entry.path, f"{prefix}{entry.name}/"))
+                elif entry.is_file():
+                    files.append(prefix + entry.name)
+                    if len(files) >= limit:
+                        break
+    return files
+
+
+# Deletes trees handed to rmtree_in_background; drained before the process exits
+_rmtree_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rmtree")
+atexit.register(_rmtree_executor.shutdown, wait=True)
+
+
+def rmtree_in_background(path: Path | str) -> None:
+    """Remove a directory tree without blocking the caller.
+
+    The tree is first renamed to a hidden sibling, so its path is free again
+    at once, then deleted on a worker thread. Falls back to deleting in place
+    if the rename fails (e.g. the path is already gone).
+    """
+    path = Path(path)
+    doomed = path.with_name(f".trash-{path.name}-{os.getpid()}")
+    try:
+        os.rename(path, doomed)
+    except OSError:
+        doomed = path
+    _rmtree_executor.submit(shutil.rmtree, doomed, ignore_errors=True)
@@ -2,23 +2,76 @@
 
 from __future__ import annotations
 
+import errno
+import os
+import socket
 import subprocess
-from dataclasses import dataclass, field
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Mapping, Optional
 from unittest.mock import MagicMock
 
+from microvm_orchestrator.core.vm import VMProcess
 
-@dataclass
+# Captured at import so PTYMock.close keeps working while os.close is patched
+_real_os_close = os.close
+
+
+@dataclass(slots=True, frozen=True)
 class MockCompletedProcess:
-    """Mock subprocess.CompletedProcess for git command tests."""
+    """Mock subprocess.CompletedProcess for git command tests.
+
+    Frozen so a configured response can be handed out as-is on every
+    matching call instead of being copied.
+    """
 
-    args: list[str] = field(default_factory=list)
+    args: tuple[str, ...] = ()
     returncode: int = 0
     stdout: str = ""
     stderr: str = ""
 
 
+class CallLog(Sequence[tuple[str, ...]]):
+    """Read-only view of recorded commands with O(1) membership tests.
+
+    ``cmd in log`` is a hash lookup in a multiset of command tuples rather
+    than a scan over the history; indexing and iteration follow call order.
+    """
+
+    def __init__(
+        self,
+        history: deque[tuple[str, ...]],
+        counts: Counter[tuple[str, ...]],
+    ):
+        self._history = history
+        self._counts = counts
+
+    def __contains__(self, cmd: object) -> bool:
+        if not isinstance(cmd, Iterable) or isinstance(cmd, str):
+            return False
+        return self._counts[tuple(cmd)] > 0
+
+    def count(self, cmd: Iterable[str]) -> int:
+        """Return how many times ``cmd`` was called."""
+        return self._counts[tuple(cmd)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._history)[index]
+        return self._history[index]
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        return iter(self._history)
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    def __repr__(self) -> str:
+        return f"CallLog({list(self._history)!r})"
+
+
 class SubprocessMock:
     """
     Context manager for mocking subprocess.run with configurable responses.
@@ -32,7 +85,8 @@ class SubprocessMock:
     def __init__(self):
         self._responses: dict[tuple[str, ...], MockCompletedProcess] = {}
         self._default_response = MockCompletedProcess()
-        self._call_history: list[list[str]] = []
+        self._call_history: deque[tuple[str, ...]] = deque()
+        self._call_counts: Counter[tuple[str, ...]] = Counter()
         self._original_run: Optional[Callable] = None
 
     def set_response(
@@ -45,21 +99,28 @@ class SubprocessMock:
         """Set response for a specific command."""
         key = tuple(cmd)
         self._responses[key] = MockCompletedProcess(
-            args=cmd,
+            args=key,
             returncode=returncode,
             stdout=stdout,
             stderr=stderr,
         )
 
+    def set_responses(
+        self,
+        responses: Mapping[tuple[str, ...], MockCompletedProcess],
+    ) -> None:
+        """Install a table of prebuilt responses keyed by full command tuple."""
+        self._responses.update(responses)
+
     def set_git_response(
         self,
-        git_args: list[str],
+        git_args: Sequence[str],
         returncode: int = 0,
         stdout: str = "",
         stderr: str = "",
     ) -> None:
         """Set response for a git command (auto-prepends 'git')."""
-        self.set_response(["git"] + git_args, returncode, stdout, stderr)
+        self.set_response(["git", *git_args], returncode, stdout, stderr)
 
     def set_default(
         self,
@@ -80,10 +141,13 @@ class SubprocessMock:
         **kwargs: Any,
     ) -> MockCompletedProcess:
         """Mock implementation of subprocess.run."""
-        self._call_history.append(args)
         key = tuple(args)
+        self._call_history.append(key)
+        self._call_counts[key] += 1
 
-        response = self._responses.get(key, self._default_response)
+        response = self._responses.get(key)
+        if response is None:
+            response = replace(self._default_response, args=key)
 
         # Handle check=True
         if kwargs.get("check") and response.returncode != 0:
@@ -94,17 +158,12 @@ class SubprocessMock:
                 response.stderr,
             )
 
-        return MockCompletedProcess(
-            args=args,
-            returncode=response.returncode,
-            stdout=response.stdout,
-            stderr=response.stderr,
-        )
+        return response
 
     @property
-    def calls(self) -> list[list[str]]:
-        """Get list of all commands that were called."""
-        return self._call_history
+    def calls(self) -> CallLog:
+        """Get all commands that were called, as a read-only view."""
+        return CallLog(self._call_history, self._call_counts)
 
     def __enter__(self) -> SubprocessMock:
         self._original_run = subprocess.run
@@ -157,46 +216,47 @@ class PopenMock:
 
 
 class PTYMock:
-    """Mock for PTY operations (pty.openpty, os.read, select.select)."""
+    """Mock for pty.openpty backed by a real socketpair.
+
+    ``master_fd`` and ``slave_fd`` are real file descriptors, so the code
+    under test can use the real ``select.select`` and ``os.read`` on them.
+    ``output_data`` is queued on the master side up front. An extra handle
+    on the slave side is held (like the VM child process would) so the
+    parent closing ``slave_fd`` does not signal EOF.
+    """
 
     def __init__(self, output_data: bytes = b""):
         self.output_data = output_data
-        self._read_position = 0
-        self.master_fd = 100
-        self.slave_fd = 101
+        master, slave = socket.socketpair()
+        slave.sendall(output_data)
+        self.master_fd = master.detach()
+        self.slave_fd = slave.detach()
+        self._held_fd = os.dup(self.slave_fd)
         self._closed_fds: set[int] = set()
 
     def openpty(self) -> tuple[int, int]:
         """Mock pty.openpty()."""
         return self.master_fd, self.slave_fd
 
-    def read(self, fd: int, size: int) -> bytes:
-        """Mock os.read()."""
+    def close(self, fd: int) -> None:
+        """Track and perform os.close() so fds are never closed twice."""
         if fd in self._closed_fds:
-            raise OSError("PTY closed")
-
-        if self._read_position >= len(self.output_data):
-            raise OSError("No more data")
+            raise OSError(errno.EBADF, "Bad file descriptor")
+        if fd in (self.master_fd, self.slave_fd, self._held_fd):
+            self._closed_fds.add(fd)
+        _real_os_close(fd)
 
-        chunk = self.output_data[self._read_position:self._read_position + size]
-        self._read_position += len(chunk)
-        return chunk
+    def hangup(self) -> None:
+        """Close the slave side, so a reader blocked on ``master_fd`` sees EOF."""
+        for fd in (self.slave_fd, self._held_fd):
+            if fd not in self._closed_fds:
+                self.close(fd)
 
-    def close(self, fd: int) -> None:
-        """Mock os.close()."""
-        self._closed_fds.add(fd)
-
-    def select(
-        self,
-        rlist: list[int],
-        wlist: list[int],
-        xlist: list[int],
-        timeout: Optional[float] = None,
-    ) -> tuple[list[int], list[int], list[int]]:
-        """Mock select.select()."""
-        # Return readable if there's data and fd is not closed
-        readable = [fd for fd in rlist if fd not in self._closed_fds and self._read_position < len(self.output_data)]
-        return readable, [], []
+    def close_all(self) -> None:
+        """Close any descriptors the code under test left open."""
+        for fd in (self.master_fd, self.slave_fd, self._held_fd):
+            if fd not in self._closed_fds:
+                self.close(fd)
 
 
 def create_git_repo(path: Path) -> None:
@@ -213,7 +273,7 @@ def create_git_repo(path: Path) -> None:
 def mock_orchestrator_deps() -> dict[str, MagicMock]:
     """Create mocks for Orchestrator's external dependencies."""
     return {
-        "vm_process": MagicMock(spec=["start", "stop", "is_running", "exit_code"]),
+        "vm_process": MagicMock(spec=VMProcess),
         "git_setup": MagicMock(return_value="abc123"),
         "git_merge": MagicMock(),
     }
@@ -5,14 +5,44 @@ from __future__ import annotations
 import random
 import string
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 from click.testing import CliRunner
 
-from microvm_orchestrator.cli import _extract_token, cli
+from microvm_orchestrator.cli import _extract_token, cli, list_repos
 from microvm_orchestrator.core.registry import RepoNotGitError, UnknownRepoError
 
+from .fixtures.helpers import capture_calls
+
+
+# Token alphabets for _fake_token, keyed by (underscores, dashes).
+_ALPHABETS = {
+    (underscores, dashes): (
+        string.ascii_letters + string.digits
+        + ("_" if underscores else "")
+        + ("-" if dashes else "")
+    )
+    for underscores in (False, True)
+    for dashes in (False, True)
+}
+
+
+def _fake_token_body(
+    length: int = 60,
+    *,
+    seed: int = 0,
+    underscores: bool = True,
+    dashes: bool = True,
+) -> str:
+    """Generate the random part of a fake token (no ``sk-ant-`` prefix).
+
+    Useful on its own as the continuation line of a line-wrapped token.
+    """
+    rng = random.Random(seed)
+    return "".join(rng.choices(_ALPHABETS[underscores, dashes], k=length))
+
 
 def _fake_token(
     prefix: str = "oat01",
@@ -28,13 +58,7 @@ def _fake_token(
     and optionally underscores/dashes) without embedding anything
     that could be mistaken for a real credential.
     """
-    rng = random.Random(seed)
-    alphabet = string.ascii_letters + string.digits
-    if underscores:
-        alphabet += "_"
-    if dashes:
-        alphabet += "-"
-    body = "".join(rng.choice(alphabet) for _ in range(length))
+    body = _fake_token_body(length, seed=seed, underscores=underscores, dashes=dashes)
     return f"sk-ant-{prefix}-{body}"
 
 
@@ -43,9 +67,9 @@ def _fake_token(
 # =============================================================================
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def cli_runner() -> CliRunner:
-    """Click test runner."""
+    """Click test runner, shared by the module (each invoke() is isolated)."""
     return CliRunner()
 
 
@@ -59,6 +83,32 @@ def mock_registry():
         yield mock_instance
 
 
+@pytest.fixture(scope="session")
+def setup_token_root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """One temp directory shared by all setup-token tests (a subdir each)."""
+    return tmp_path_factory.mktemp("setup_token")
+
+
+@pytest.fixture
+def patched_setup_token(setup_token_root: Path, request: pytest.FixtureRequest):
+    """Patch everything 'setup-token' touches outside the process.
+
+    'claude' is found on PATH, Path.home() is a fresh per-test directory
+    under setup_token_root, and subprocess.run is a mock whose
+    return_value each test sets.
+    """
+    home = setup_token_root / request.node.name
+    home.mkdir()
+    with patch("microvm_orchestrator.cli.shutil.which", return_value="/usr/bin/claude") as which, \
+         patch("microvm_orchestrator.cli.subprocess.run") as run, \
+         patch("microvm_orchestrator.cli.Path.home", return_value=home):
+        yield {
+            "which": which,
+            "run": run,
+            "token_file": home / ".microvm-orchestrator" / "token",
+        }
+
+
 # =============================================================================
 # Allow Tests
 # =============================================================================
@@ -72,52 +122,58 @@ class TestAllow:
     ):
         """No args defaults to path='.' and alias=None."""
         mock_registry.allow.return_value = "project"
-        result = cli_runner.invoke(cli, ["allow"], catch_exceptions=False)
+        calls = capture_calls(mock_registry.allow)
+        result = cli_runner.invoke(
+            cli, ["allow"], catch_exceptions=False, standalone_mode=False
+        )
 
         assert result.exit_code == 0
-        mock_registry.allow.assert_called_once()
-        # alias should be None (default)
-        _, kwargs = mock_registry.allow.call_args
-        assert kwargs.get("alias") is None or mock_registry.allow.call_args[0][1:] == ()
+        assert calls == [((Path("."), None), {})]
 
     def test_allow_explicit_path(
         self, cli_runner: CliRunner, mock_registry: MagicMock, tmp_project: Path
     ):
         """Explicit path argument is passed through."""
         mock_registry.allow.return_value = "project"
+        calls = capture_calls(mock_registry.allow)
         result = cli_runner.invoke(
-            cli, ["allow", str(tmp_project)], catch_exceptions=False
+            cli, ["allow", str(tmp_project)],
+            catch_exceptions=False,
+            standalone_mode=False,
         )
 
         assert result.exit_code == 0
-        call_args = mock_registry.allow.call_args
-        assert call_args[0][0] == Path(str(tmp_project))
+        assert calls[0][0][0] == Path(str(tmp_project))
 
     def test_allow_custom_alias(
         self, cli_runner: CliRunner, mock_registry: MagicMock, tmp_project: Path
     ):
         """--alias option is forwarded."""
         mock_registry.allow.return_value = "myalias"
+        calls = capture_calls(mock_registry.allow)
         result = cli_runner.invoke(
-            cli, ["allow", str(tmp_project), "--alias", "myalias"], catch_exceptions=False
+            cli, ["allow", str(tmp_project), "--alias", "myalias"],
+            catch_exceptions=False,
+            standalone_mode=False,
         )
 
         assert result.exit_code == 0
-        call_args = mock_registry.allow.call_args
-        assert call_args[0][1] == "myalias"
+        assert calls[0][0][1] == "myalias"
 
     def test_allow_short_alias_flag(
         self, cli_runner: CliRunner, mock_registry: MagicMock, tmp_project: Path
     ):
         """-a short flag works for alias."""
         mock_registry.allow.return_value = "myalias"
+        calls = capture_calls(mock_registry.allow)
         result = cli_runner.invoke(
-            cli, ["allow", str(tmp_project), "-a", "myalias"], catch_exceptions=False
+            cli, ["allow", str(tmp_project), "-a", "myalias"],
+            catch_exceptions=False,
+            standalone_mode=False,
         )
 
         assert result.exit_code == 0
-        call_args = mock_registry.allow.call_args
-        assert call_args[0][1] == "myalias"
+        assert calls[0][0][1] == "myalias"
 
     def test_allow_prints_registered_alias(
         self, cli_runner: CliRunner, mock_registry: MagicMock, tmp_project: Path
@@ -125,11 +181,13 @@ class TestAllow:
         """Output contains 'Registered: <alias>'."""
         mock_registry.allow.return_value = "my-repo"
         result = cli_runner.invoke(
-            cli, ["allow", str(tmp_project)], catch_exceptions=False
+            cli, ["allow", str(tmp_project)],
+            catch_exceptions=False,
+            standalone_mode=False,
         )
 
         assert result.exit_code == 0
-        assert "Registered: my-repo" in result.output
+        assert "Registered: my-repo" in result.stdout
 
     def test_allow_non_git_error(
         self, cli_runner: CliRunner, mock_registry: MagicMock, tmp_path: Path
@@ -158,27 +216,30 @@ class TestAllow:
 
 
 class TestListRepos:
-    """Tests for the 'list' command."""
+    """Tests for the 'list' command.
+
+    'list' takes no arguments, so these call the command callback directly
+    and read stdout via capsys rather than going through CliRunner.
+    """
 
-    def test_list_empty(self, cli_runner: CliRunner, mock_registry: MagicMock):
+    def test_list_empty(self, mock_registry: MagicMock, capsys: pytest.CaptureFixture[str]):
         """No repos prints helpful message."""
         mock_registry.list.return_value = {}
-        result = cli_runner.invoke(cli, ["list"], catch_exceptions=False)
+        list_repos.callback()
 
-        assert result.exit_code == 0
-        assert "No repositories registered." in result.output
+        assert "No repositories registered." in capsys.readouterr().out
 
-    def test_list_shows_repos(self, cli_runner: CliRunner, mock_registry: MagicMock):
+    def test_list_shows_repos(self, mock_registry: MagicMock, capsys: pytest.CaptureFixture[str]):
         """Repos are listed as 'alias: /path' lines."""
         mock_registry.list.return_value = {
             "proj-a": {"path": "/home/user/proj-a"},
             "proj-b": {"path": "/home/user/proj-b"},
         }
-        result = cli_runner.invoke(cli, ["list"], catch_exceptions=False)
+        list_repos.callback()
 
-        assert result.exit_code == 0
-        assert "proj-a: /home/user/proj-a" in result.output
-        assert "proj-b: /home/user/proj-b" in result.output
+        out = capsys.readouterr().out
+        assert "proj-a: /home/user/proj-a" in out
+        assert "proj-b: /home/user/proj-b" in out
 
 
 # =============================================================================
@@ -191,10 +252,12 @@ class TestRemove:
 
     def test_remove_success(self, cli_runner: CliRunner, mock_registry: MagicMock):
         """Successful remove prints 'Removed: <alias>'."""
-        result = cli_runner.invoke(cli, ["remove", "myrepo"], catch_exceptions=False)
+        result = cli_runner.invoke(
+            cli, ["remove", "myrepo"], catch_exceptions=False, standalone_mode=False
+        )
 
         assert result.exit_code == 0
-        assert "Removed: myrepo" in result.output
+        assert "Removed: myrepo" in result.stdout
         mock_registry.remove.assert_called_once_with("myrepo")
 
     def test_remove_unknown_error(self, cli_runner: CliRunner, mock_registry: MagicMock):
@@ -225,7 +288,9 @@ class TestServe:
     def test_serve_calls_run(self, cli_runner: CliRunner):
         """serve command calls server.run()."""
         with patch("microvm_orchestrator.server.run") as mock_run:
-            result = cli_runner.invoke(cli, ["serve"], catch_exceptions=False)
+            result = cli_runner.invoke(
+                cli, ["serve"], catch_exceptions=False, standalone_mode=False
+            )
 
         assert result.exit_code == 0
         mock_run.assert_called_once()
@@ -236,255 +301,225 @@ class TestServe:
 # =============================================================================
 
 
-class TestExtractToken:
-    """Unit tests for _extract_token regex parsing."""
-
+# _fake_token arguments for every token the _extract_token cases use, keyed by seed.
+_EXTRACT_TOKEN_SPECS: dict[int, dict] = {
+    1: {"length": 20, "underscores": False, "dashes": False},
+    2: {"prefix": "api03", "length": 20, "dashes": False},
+    3: {"length": 20, "underscores": False},
+    4: {"length": 30},
+    5: {"length": 100},
+    6: {"prefix": "api03", "length": 40},
+    7: {"length": 20},
+    8: {"length": 30},
+    9: {"length": 30},
+    10: {"prefix": "api03", "length": 20},
+    11: {"length": 80},
+    13: {"length": 80},
+    14: {"length": 80},
+    15: {"length": 60},
+    16: {"length": 40},
+    17: {"length": 10},
+    18: {"length": 10},
+    19: {"length": 20},
+    20: {"length": 20},
+    21: {"length": 20},
+    22: {"length": 20},
+    23: {"length": 20},
+    24: {"length": 20},
+    25: {"length": 30},
+    26: {"length": 80},
+    27: {"length": 80},
+    29: {"length": 20},
+    30: {"length": 20},
+    31: {"length": 20},
+    32: {"length": 30},
+    33: {"length": 20},
+    34: {"length": 20},
+    35: {"length": 20},
+    36: {"length": 20},
+    37: {"length": 20},
+    38: {"length": 20},
+}
+
+# Tokens for the _extract_token cases, generated once at import.
+_TOKENS = {
+    seed: _fake_token(**kwargs, seed=seed)
+    for seed, kwargs in _EXTRACT_TOKEN_SPECS.items()
+}
+
+# Continuation-line fragments for the line-wrapped claude output cases.
+_FRAGMENTS = {seed: _fake_token_body(12, seed=seed) for seed in (12, 28)}
+
+_OAT_PREFIX_LEN = len("sk-ant-oat01-")
+
+
+def _wrap(token: str, *cuts: int) -> list[str]:
+    """Split ``token`` into lines at the given offsets into its body."""
+    bounds = [0, *(_OAT_PREFIX_LEN + cut for cut in cuts), len(token)]
+    return [token[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _claude_output(part1: str, part2: str, *, ansi: bool = False) -> str:
+    """Render output in the shape of a real 'claude setup-token' run."""
+    if ansi:
+        check = "\x1b[32m\u2713\x1b[0m"
+        part1, part2 = f"\x1b[33m{part1}\x1b[0m", f"\x1b[33m{part2}\x1b[0m"
+    else:
+        check = "\u2713"
+    return (
+        f"{check} Long-lived authentication token created successfully!\n"
+        "\n"
+        "Your OAuth token (valid for 1 year):\n"
+        "\n"
+        f"{part1}\n"
+        f"{part2}\n"
+        "\n"
+        "Store this token securely. You won't be able to see it again.\n"
+        "\n"
+        "Use this token by setting: export CLAUDE_CODE_OAUTH_TOKEN=<token>\n"
+    )
+
+
+# (output, expected) pairs for _extract_token.
+_EXTRACT_CASES = [
     # -- Basic token formats --------------------------------------------------
-
-    def test_simple_token(self):
-        """Plain sk-ant- token on a single line."""
-        token = _fake_token(length=20, seed=1, underscores=False, dashes=False)
-        assert _extract_token(token + "\n") == token
-
-    def test_token_with_underscores(self):
-        """Tokens containing underscores are captured fully."""
-        token = _fake_token("api03", length=20, seed=2, dashes=False)
-        assert _extract_token(token + "\n") == token
-
-    def test_token_with_dashes(self):
-        """Tokens containing internal dashes are captured fully."""
-        token = _fake_token(length=20, seed=3, underscores=False)
-        assert _extract_token(token + "\n") == token
-
-    def test_token_with_mixed_underscores_and_dashes(self):
-        """Tokens with both underscores and dashes."""
-        token = _fake_token(length=30, seed=4)
-        assert _extract_token(token + "\n") == token
-
-    def test_long_oauth_token(self):
-        """Full-length OAuth token with underscores/dashes."""
-        token = _fake_token(length=100, seed=5)
-        assert _extract_token(token + "\n") == token
-
-    def test_api_key_format(self):
-        """API key format (sk-ant-api03-...)."""
-        token = _fake_token("api03", length=40, seed=6)
-        assert _extract_token(token + "\n") == token
-
+    # Plain token; underscores; dashes; both; full-length OAuth; API key format
+    pytest.param(_TOKENS[1] + "\n", _TOKENS[1], id="simple_token"),
+    pytest.param(_TOKENS[2] + "\n", _TOKENS[2], id="token_with_underscores"),
+    pytest.param(_TOKENS[3] + "\n", _TOKENS[3], id="token_with_dashes"),
+    pytest.param(_TOKENS[4] + "\n", _TOKENS[4], id="token_with_mixed_underscores_and_dashes"),
+    pytest.param(_TOKENS[5] + "\n", _TOKENS[5], id="long_oauth_token"),
+    pytest.param(_TOKENS[6] + "\n", _TOKENS[6], id="api_key_format"),
     # -- Noisy output ---------------------------------------------------------
-
-    def test_token_surrounded_by_text(self):
-        """Token embedded in a line with surrounding text."""
-        token = _fake_token(length=20, seed=7)
-        output = f"Your token is: {token} (save it)\n"
-        assert _extract_token(output) == token
-
-    def test_noisy_output_with_banner(self):
-        """Token extracted from output with banners and decorations."""
-        token = _fake_token(length=30, seed=8)
-        output = (
-            "Welcome to Claude Code v2.1.39\n"
-            "===========================\n"
-            "Your OAuth token (valid for 1 year):\n"
-            f"{token}\n"
-            "Store this token securely.\n"
-        )
-        assert _extract_token(output) == token
-
-    def test_noisy_output_does_not_absorb_trailing_text(self):
-        """Trailing English text must NOT be included in the token."""
-        token = _fake_token(length=30, seed=9)
-        output = (
-            "Your token:\n"
-            f"{token}\n"
-            "Store this token securely.\n"
-        )
-        result = _extract_token(output)
-        assert result == token
-        assert "Store" not in result
-
-    def test_token_on_line_with_prefix_text(self):
-        """Token preceded by text on the same line."""
-        token = _fake_token("api03", length=20, seed=10)
-        output = f"Token: {token}\n"
-        assert _extract_token(output) == token
-
-    def test_real_claude_output_format(self):
-        """Output format matching real 'claude setup-token' structure."""
-        part1 = _fake_token(length=80, seed=11)
-        part2 = _fake_token(length=12, seed=12).removeprefix("sk-ant-oat01-")
-        output = (
-            "\u2713 Long-lived authentication token created successfully!\n"
-            "\n"
-            "Your OAuth token (valid for 1 year):\n"
-            "\n"
-            f"{part1}\n"
-            f"{part2}\n"
-            "\n"
-            "Store this token securely. You won't be able to see it again.\n"
-            "\n"
-            "Use this token by setting: export CLAUDE_CODE_OAUTH_TOKEN=<token>\n"
-        )
-        result = _extract_token(output)
-        assert result == part1 + part2
-
+    pytest.param(
+        f"Your token is: {_TOKENS[7]} (save it)\n", _TOKENS[7],
+        id="token_surrounded_by_text",
+    ),
+    pytest.param(
+        "Welcome to Claude Code v2.1.39\n"
+        "===========================\n"
+        "Your OAuth token (valid for 1 year):\n"
+        f"{_TOKENS[8]}\n"
+        "Store this token securely.\n",
+        _TOKENS[8],
+        id="noisy_output_with_banner",
+    ),
+    # Trailing English text must NOT be included in the token
+    pytest.param(
+        f"Your token:\n{_TOKENS[9]}\nStore this token securely.\n", _TOKENS[9],
+        id="noisy_output_does_not_absorb_trailing_text",
+    ),
+    pytest.param(f"Token: {_TOKENS[10]}\n", _TOKENS[10], id="token_on_line_with_prefix_text"),
+    pytest.param(
+        _claude_output(_TOKENS[11], _FRAGMENTS[12]),
+        _TOKENS[11] + _FRAGMENTS[12],
+        id="real_claude_output_format",
+    ),
     # -- Line-wrapped tokens --------------------------------------------------
-
-    def test_line_wrapped_token(self):
-        """Token split across two lines is reassembled."""
-        full = _fake_token(length=80, seed=13)
-        split_at = 50
-        line1 = full[:len("sk-ant-oat01-") + split_at]
-        line2 = full[len("sk-ant-oat01-") + split_at:]
-        output = f"{line1}\n{line2}\n"
-        result = _extract_token(output)
-        assert result == full
-        assert "\n" not in result
-        assert " " not in result
-
-    def test_line_wrapped_token_with_surrounding_text(self):
-        """Line-wrapped token inside noisy output."""
-        full = _fake_token(length=80, seed=14)
-        split_at = 50
-        line1 = full[:len("sk-ant-oat01-") + split_at]
-        line2 = full[len("sk-ant-oat01-") + split_at:]
-        output = (
-            "Welcome to Claude Code v2.1.39\n"
-            "some ASCII art here\n"
-            "Your OAuth token (valid for 1 year):\n"
-            "\n"
-            "\n"
-            f"{line1}\n"
-            f"{line2}\n"
-            "Store this token securely.\n"
-        )
-        result = _extract_token(output)
-        assert result == full
-
-    def test_line_wrapped_three_lines(self):
-        """Token split across three lines."""
-        full = _fake_token(length=60, seed=15)
-        prefix_len = len("sk-ant-oat01-")
-        p1 = full[:prefix_len + 20]
-        p2 = full[prefix_len + 20:prefix_len + 40]
-        p3 = full[prefix_len + 40:]
-        output = f"{p1}\n{p2}\n{p3}\nDone.\n"
-        result = _extract_token(output)
-        assert result == full
-
-    def test_blank_lines_between_token_start_and_continuation(self):
-        """Blank lines between token lines are skipped."""
-        full = _fake_token(length=40, seed=16)
-        prefix_len = len("sk-ant-oat01-")
-        line1 = full[:prefix_len + 20]
-        line2 = full[prefix_len + 20:]
-        output = f"Your token:\n\n{line1}\n\n{line2}\nDone.\n"
-        result = _extract_token(output)
-        assert result == full
-
+    pytest.param("\n".join(_wrap(_TOKENS[13], 50)) + "\n", _TOKENS[13], id="line_wrapped_token"),
+    pytest.param(
+        "Welcome to Claude Code v2.1.39\n"
+        "some ASCII art here\n"
+        "Your OAuth token (valid for 1 year):\n"
+        "\n"
+        "\n"
+        + "\n".join(_wrap(_TOKENS[14], 50))
+        + "\nStore this token securely.\n",
+        _TOKENS[14],
+        id="line_wrapped_token_with_surrounding_text",
+    ),
+    pytest.param(
+        "\n".join(_wrap(_TOKENS[15], 20, 40)) + "\nDone.\n", _TOKENS[15],
+        id="line_wrapped_three_lines",
+    ),
+    # Blank lines between token lines are skipped
+    pytest.param(
+        "Your token:\n\n" + "\n\n".join(_wrap(_TOKENS[16], 20)) + "\nDone.\n", _TOKENS[16],
+        id="blank_lines_between_token_start_and_continuation",
+    ),
     # -- Edge cases -----------------------------------------------------------
-
-    def test_no_token_returns_none(self):
-        """Returns None when no sk-ant- token is present."""
-        assert _extract_token("No token here\n") is None
-
-    def test_empty_string_returns_none(self):
-        """Returns None for empty input."""
-        assert _extract_token("") is None
-
-    def test_only_whitespace_returns_none(self):
-        """Returns None for whitespace-only input."""
-        assert _extract_token("  \n  \n  \n") is None
-
-    def test_partial_prefix_not_matched(self):
-        """sk-ant without trailing dash+chars is not a valid token."""
-        assert _extract_token("sk-ant\n") is None
-
-    def test_sk_ant_dash_with_chars(self):
-        """Minimal valid token: sk-ant- followed by at least one char."""
-        assert _extract_token("sk-ant-x\n") == "sk-ant-x"
-
-    def test_only_first_token_returned(self):
-        """If multiple tokens appear, only the first is returned."""
-        t1 = _fake_token(length=10, seed=17)
-        t2 = _fake_token(length=10, seed=18)
-        output = f"{t1}\n{t2}\n"
-        assert _extract_token(output) == t1
-
-    def test_continuation_stops_at_sentence(self):
-        """Continuation line with spaces/punctuation is not absorbed."""
-        token = _fake_token(length=20, seed=19)
-        output = f"{token}\nPlease save this token.\n"
-        assert _extract_token(output) == token
-
-    def test_continuation_stops_at_mixed_content(self):
-        """Line starting with token chars but containing spaces is not absorbed."""
-        token = _fake_token(length=20, seed=20)
-        output = f"{token}\nDone with setup\n"
-        assert _extract_token(output) == token
-
-    def test_token_ending_mid_line(self):
-        """Token that ends mid-line does not collect continuations."""
-        token = _fake_token(length=20, seed=21)
-        output = f"Token: {token} is your key\nDEADBEEF\n"
-        assert _extract_token(output) == token
-
-    def test_windows_line_endings(self):
-        """Handles \\r\\n line endings."""
-        token = _fake_token(length=20, seed=22)
-        output = f"Your token:\r\n{token}\r\nDone.\r\n"
-        assert _extract_token(output) == token
-
-    def test_token_with_leading_whitespace(self):
-        """Leading whitespace on token line is stripped."""
-        token = _fake_token(length=20, seed=23)
-        output = f"   {token}\n"
-        assert _extract_token(output) == token
-
-    def test_token_with_trailing_whitespace(self):
-        """Trailing whitespace on token line does not break extraction."""
-        token = _fake_token(length=20, seed=24)
-        output = f"{token}   \nDone.\n"
-        assert _extract_token(output) == token
-
+    pytest.param("No token here\n", None, id="no_token_returns_none"),
+    pytest.param("", None, id="empty_string_returns_none"),
+    pytest.param("  \n  \n  \n", None, id="only_whitespace_returns_none"),
+    # sk-ant without trailing dash+chars is not a valid token
+    pytest.param("sk-ant\n", None, id="partial_prefix_not_matched"),
+    # Minimal valid token: sk-ant- followed by at least one char
+    pytest.param("sk-ant-x\n", "sk-ant-x", id="sk_ant_dash_with_chars"),
+    # If multiple tokens appear, only the first is returned
+    pytest.param(f"{_TOKENS[17]}\n{_TOKENS[18]}\n", _TOKENS[17], id="only_first_token_returned"),
+    # Continuation lines with spaces/punctuation are not absorbed
+    pytest.param(
+        f"{_TOKENS[19]}\nPlease save this token.\n", _TOKENS[19],
+        id="continuation_stops_at_sentence",
+    ),
+    pytest.param(
+        f"{_TOKENS[20]}\nDone with setup\n", _TOKENS[20],
+        id="continuation_stops_at_mixed_content",
+    ),
+    # A token that ends mid-line does not collect continuations
+    pytest.param(
+        f"Token: {_TOKENS[21]} is your key\nDEADBEEF\n", _TOKENS[21],
+        id="token_ending_mid_line",
+    ),
+    pytest.param(
+        f"Your token:\r\n{_TOKENS[22]}\r\nDone.\r\n", _TOKENS[22],
+        id="windows_line_endings",
+    ),
+    pytest.param(f"   {_TOKENS[23]}\n", _TOKENS[23], id="token_with_leading_whitespace"),
+    pytest.param(f"{_TOKENS[24]}   \nDone.\n", _TOKENS[24], id="token_with_trailing_whitespace"),
     # -- ANSI escape codes ----------------------------------------------------
-
-    def test_ansi_color_codes_stripped(self):
-        """ANSI color codes around token are stripped before matching."""
-        token = _fake_token(length=30, seed=25)
-        output = f"\x1b[33m{token}\x1b[0m\n"
-        assert _extract_token(output) == token
-
-    def test_ansi_codes_on_line_wrapped_token(self):
-        """ANSI codes don't prevent continuation line collection."""
-        full = _fake_token(length=80, seed=26)
-        split_at = 50
-        line1 = full[:len("sk-ant-oat01-") + split_at]
-        line2 = full[len("sk-ant-oat01-") + split_at:]
-        output = (
-            f"\x1b[33m{line1}\x1b[0m\n"
-            f"\x1b[33m{line2}\x1b[0m\n"
-            "Store this token securely.\n"
-        )
-        assert _extract_token(output) == full
-
-    def test_ansi_codes_in_real_claude_output(self):
-        """Full claude setup-token output with ANSI escape codes throughout."""
-        part1 = _fake_token(length=80, seed=27)
-        part2 = _fake_token(length=12, seed=28).removeprefix("sk-ant-oat01-")
-        output = (
-            "\x1b[32m\u2713\x1b[0m Long-lived authentication token created successfully!\n"
-            "\n"
-            "Your OAuth token (valid for 1 year):\n"
-            "\n"
-            f"\x1b[33m{part1}\x1b[0m\n"
-            f"\x1b[33m{part2}\x1b[0m\n"
-            "\n"
-            "Store this token securely. You won't be able to see it again.\n"
-            "\n"
-            "Use this token by setting: export CLAUDE_CODE_OAUTH_TOKEN=<token>\n"
-        )
-        assert _extract_token(output) == part1 + part2
+    pytest.param(f"\x1b[33m{_TOKENS[25]}\x1b[0m\n", _TOKENS[25], id="ansi_color_codes_stripped"),
+    pytest.param(
+        "".join(f"\x1b[33m{line}\x1b[0m\n" for line in _wrap(_TOKENS[26], 50))
+        + "Store this token securely.\n",
+        _TOKENS[26],
+        id="ansi_codes_on_line_wrapped_token",
+    ),
+    pytest.param(
+        _claude_output(_TOKENS[27], _FRAGMENTS[28], ansi=True),
+        _TOKENS[27] + _FRAGMENTS[28],
+        id="ansi_codes_in_real_claude_output",
+    ),
+    # A trailing partial CSI is not stripped, so the token does not end the
+    # line and the next line is not collected
+    pytest.param(f"{_TOKENS[29]}\x1b[\nDEADBEEF\n", _TOKENS[29], id="trailing_partial_csi"),
+    # A complete escape at the end of the line still allows a continuation
+    pytest.param(
+        f"{_TOKENS[30]}\x1b[0m\nDEADBEEF\n", _TOKENS[30] + "DEADBEEF",
+        id="ansi_code_at_end_of_token_line",
+    ),
+    pytest.param(
+        f"{_TOKENS[31][:25]}\x1b[1m{_TOKENS[31][25:]}\n", _TOKENS[31],
+        id="ansi_code_inside_token_body",
+    ),
+    # -- Continuation characters ----------------------------------------------
+    pytest.param(
+        f"{_TOKENS[32]}\nab+cd/ef==\nDone.\n", _TOKENS[32] + "ab+cd/ef==",
+        id="continuation_with_plus_slash_equals",
+    ),
+    # -- Unicode whitespace and line breaks (str.splitlines/str.strip) --------
+    pytest.param(f"{_TOKENS[33]}\vDEADBEEF\n", _TOKENS[33] + "DEADBEEF", id="vertical_tab_ends_line"),
+    pytest.param(f"{_TOKENS[34]}\fDEADBEEF\n", _TOKENS[34] + "DEADBEEF", id="form_feed_ends_line"),
+    pytest.param(f"{_TOKENS[35]}\x85DEADBEEF\n", _TOKENS[35] + "DEADBEEF", id="nel_ends_line"),
+    pytest.param(
+        f"{_TOKENS[36]}\u2028DEADBEEF\n", _TOKENS[36] + "DEADBEEF",
+        id="line_separator_ends_line",
+    ),
+    pytest.param(
+        f"{_TOKENS[37]}\n\xa0\nDEADBEEF\n", _TOKENS[37] + "DEADBEEF",
+        id="nbsp_line_is_blank",
+    ),
+    pytest.param(
+        f"{_TOKENS[38]}\n\xa0\n", _TOKENS[38], id="trailing_nbsp_line_ignored",
+    ),
+    pytest.param("sk-ant-oat01-\x0cabc", "sk-ant-oat01-abc", id="form_feed_inside_token"),
+]
+
+
+@pytest.mark.parametrize("output,expected", _EXTRACT_CASES)
+def test_extract_token(output: str, expected: str | None):
+    """_extract_token pulls the first (possibly line-wrapped) token out of output."""
+    assert _extract_token(output) == expected
 
 
 # =============================================================================
@@ -495,31 +530,55 @@ class TestExtractToken:
 class TestSetupToken:
     """Tests for the 'setup-token' command."""
 
-    def test_setup_token_success(self, cli_runner: CliRunner, tmp_path: Path):
+    def test_setup_token_success(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
         """Successful run saves token to file with 0o600."""
-        token_dir = tmp_path / ".microvm-orchestrator"
-        token_file = token_dir / "token"
+        token_file = patched_setup_token["token_file"]
 
         token = _fake_token(length=20, seed=100)
-        mock_result = MagicMock(returncode=0, stdout=f"{token}\n", stderr="")
-        with patch("microvm_orchestrator.cli.shutil.which", return_value="/usr/bin/claude"), \
-             patch("microvm_orchestrator.cli.subprocess.run", return_value=mock_result), \
-             patch("microvm_orchestrator.cli.Path.home", return_value=tmp_path):
-            result = cli_runner.invoke(cli, ["setup-token"], catch_exceptions=False)
+        patched_setup_token["run"].return_value = SimpleNamespace(
+            returncode=0, stdout=f"{token}\n", stderr=""
+        )
+        result = cli_runner.invoke(
+            cli, ["setup-token"], catch_exceptions=False, standalone_mode=False
+        )
 
         assert result.exit_code == 0
-        assert "Token saved" in result.output
+        assert "Token saved" in result.stdout
         assert token_file.read_text() == f"{token}\n"
         assert token_file.stat().st_mode & 0o777 == 0o600
 
-    def test_setup_token_extracts_from_noisy_output(self, cli_runner: CliRunner, tmp_path: Path):
+    def test_setup_token_overwrites_existing_token(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
+        """Re-running replaces an old token and tightens loose permissions."""
+        token_file = patched_setup_token["token_file"]
+        token_file.parent.mkdir()
+        token_file.write_text("sk-ant-REDACTED\n")
+        token_file.chmod(0o644)
+
+        token = _fake_token(length=20, seed=104)
+        patched_setup_token["run"].return_value = SimpleNamespace(
+            returncode=0, stdout=f"{token}\n", stderr=""
+        )
+        result = cli_runner.invoke(
+            cli, ["setup-token"], catch_exceptions=False, standalone_mode=False
+        )
+
+        assert result.exit_code == 0
+        assert token_file.read_text() == f"{token}\n"
+        assert token_file.stat().st_mode & 0o777 == 0o600
+
+    def test_setup_token_extracts_from_noisy_output(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
         """Token is extracted from real claude setup-token output format."""
-        token_dir = tmp_path / ".microvm-orchestrator"
-        token_file = token_dir / "token"
+        token_file = patched_setup_token["token_file"]
 
         # Simulate claude setup-token output with checkmark, line wrapping, and instructions
         part1 = _fake_token(length=80, seed=101)
-        part2 = _fake_token(length=12, seed=102).removeprefix("sk-ant-oat01-")
+        part2 = _fake_token_body(12, seed=102)
         noisy_output = (
             "\u2713 Long-lived authentication token created successfully!\n"
             "\n"
@@ -532,55 +591,64 @@ class TestSetupToken:
             "\n"
             "Use this token by setting: export CLAUDE_CODE_OAUTH_TOKEN=<token>\n"
         )
-        mock_result = MagicMock(returncode=0, stdout=noisy_output, stderr="")
-        with patch("microvm_orchestrator.cli.shutil.which", return_value="/usr/bin/claude"), \
-             patch("microvm_orchestrator.cli.subprocess.run", return_value=mock_result), \
-             patch("microvm_orchestrator.cli.Path.home", return_value=tmp_path):
-            result = cli_runner.invoke(cli, ["setup-token"], catch_exceptions=False)
+        patched_setup_token["run"].return_value = SimpleNamespace(
+            returncode=0, stdout=noisy_output, stderr=""
+        )
+        result = cli_runner.invoke(
+            cli, ["setup-token"], catch_exceptions=False, standalone_mode=False
+        )
 
         assert result.exit_code == 0
         saved = token_file.read_text().strip()
         assert saved == part1 + part2
 
-    def test_setup_token_with_underscored_token(self, cli_runner: CliRunner, tmp_path: Path):
+    def test_setup_token_with_underscored_token(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
         """Token with underscores is saved correctly."""
-        token_dir = tmp_path / ".microvm-orchestrator"
-        token_file = token_dir / "token"
+        token_file = patched_setup_token["token_file"]
 
         token = _fake_token("api03", length=30, seed=103, dashes=False)
-        mock_result = MagicMock(returncode=0, stdout=f"{token}\n", stderr="")
-        with patch("microvm_orchestrator.cli.shutil.which", return_value="/usr/bin/claude"), \
-             patch("microvm_orchestrator.cli.subprocess.run", return_value=mock_result), \
-             patch("microvm_orchestrator.cli.Path.home", return_value=tmp_path):
-            result = cli_runner.invoke(cli, ["setup-token"], catch_exceptions=False)
+        patched_setup_token["run"].return_value = SimpleNamespace(
+            returncode=0, stdout=f"{token}\n", stderr=""
+        )
+        result = cli_runner.invoke(
+            cli, ["setup-token"], catch_exceptions=False, standalone_mode=False
+        )
 
         assert result.exit_code == 0
         assert token_file.read_text().strip() == token
 
-    def test_setup_token_claude_not_found(self, cli_runner: CliRunner):
+    def test_setup_token_claude_not_found(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
         """Error when claude CLI not on PATH."""
-        with patch("microvm_orchestrator.cli.shutil.which", return_value=None):
-            result = cli_runner.invoke(cli, ["setup-token"])
+        patched_setup_token["which"].return_value = None
+        result = cli_runner.invoke(cli, ["setup-token"])
 
         assert result.exit_code == 1
         assert "'claude' CLI not found" in result.output
 
-    def test_setup_token_claude_fails(self, cli_runner: CliRunner):
+    def test_setup_token_claude_fails(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
         """Error when claude setup-token exits non-zero."""
-        mock_result = MagicMock(returncode=1, stdout="", stderr="auth failed")
-        with patch("microvm_orchestrator.cli.shutil.which", return_value="/usr/bin/claude"), \
-             patch("microvm_orchestrator.cli.subprocess.run", return_value=mock_result):
-            result = cli_runner.invoke(cli, ["setup-token"])
+        patched_setup_token["run"].return_value = SimpleNamespace(
+            returncode=1, stdout="", stderr="auth failed"
+        )
+        result = cli_runner.invoke(cli, ["setup-token"])
 
         assert result.exit_code == 1
         assert "failed" in result.output
 
-    def test_setup_token_no_token_in_output(self, cli_runner: CliRunner):
+    def test_setup_token_no_token_in_output(
+        self, cli_runner: CliRunner, patched_setup_token: dict
+    ):
         """Error when output contains no recognizable token."""
-        mock_result = MagicMock(returncode=0, stdout="Some output with no token\n", stderr="")
-        with patch("microvm_orchestrator.cli.shutil.which", return_value="/usr/bin/claude"), \
-             patch("microvm_orchestrator.cli.subprocess.run", return_value=mock_result):
-            result = cli_runner.invoke(cli, ["setup-token"])
+        patched_setup_token["run"].return_value = SimpleNamespace(
+            returncode=0, stdout="Some output with no token\n", stderr=""
+        )
+        result = cli_runner.invoke(cli, ["setup-token"])
 
         assert result.exit_code == 1
         assert "Could not find a token" in result.output
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import os
 import shutil
-import subprocess
 import tempfile
 from pathlib import Path
 
@@ -14,6 +13,9 @@ from microvm_orchestrator.core.registry import RepoRegistry
 from microvm_orchestrator.core.slots import SlotManager
 from microvm_orchestrator.tools import Orchestrator
 
+from .fixtures.fast_git import init_repo
+from .fixtures.helpers import read_tail, sample_tree
+
 
 MINIMAL_FLAKE_NIX = """\
 {
@@ -55,66 +57,142 @@ Then git add and git commit the file with message 'Add hello.txt'.
 """
 
 
+def _clone_tree(src: Path, dst: Path) -> None:
+    """Copy ``src`` to ``dst``, hard-linking git objects instead of copying them.
+
+    Loose objects and packs are never modified in place, so sharing their
+    inodes with the template is safe. Everything else (worktree, index,
+    refs, config) is copied so a test can change it freely. Falls back to
+    a plain copy where hard links are not possible (e.g. across devices).
+    """
+    objects = src / ".git" / "objects"
+
+    def link_or_copy(src_file: str, dst_file: str) -> None:
+        if Path(src_file).is_relative_to(objects):
+            try:
+                os.link(src_file, dst_file)
+                return
+            except OSError:
+                pass
+        shutil.copy2(src_file, dst_file)
+
+    shutil.copytree(
+        src, dst, symlinks=True, copy_function=link_or_copy, dirs_exist_ok=True
+    )
+
+
+# Parent of per-test project copies: a short path (macOS unix socket paths
+# are limited to 104-108 chars), on tmpfs where available to skip disk
+# syncs. MICROVM_TEST_TMP overrides it, e.g. a RAM disk on macOS.
+E2E_TMP_DIR = os.environ.get("MICROVM_TEST_TMP") or (
+    "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp"
+)
+
+
+def _copy_project(template: Path, prefix: str):
+    """Yield a fresh copy of ``template`` under E2E_TMP_DIR, then remove it."""
+    project = Path(tempfile.mkdtemp(prefix=prefix, dir=E2E_TMP_DIR))
+    try:
+        _clone_tree(template, project)
+        yield project
+    finally:
+        shutil.rmtree(project, ignore_errors=True)
+
+
+# Flake variants for e2e_project: name -> (flake.nix, README.md, tmp prefix)
+E2E_FLAKES = {
+    "dual-arch": (MINIMAL_FLAKE_NIX, "# E2E Test Project\n", "e2e-"),
+    "x86-rosetta": (X86_ONLY_FLAKE_NIX, "# E2E x86_64 Test Project\n", "e2e-x86-"),
+}
+
+
+@pytest.fixture(scope="session")
+def _e2e_project_templates(tmp_path_factory: pytest.TempPathFactory):
+    """Return a function building each E2E_FLAKES project once per session."""
+    templates: dict[str, Path] = {}
+
+    def get(flake: str) -> Path:
+        if flake not in templates:
+            flake_nix, readme, _prefix = E2E_FLAKES[flake]
+            template = tmp_path_factory.mktemp(f"e2e-{flake}")
+            init_repo(
+                template,
+                {"flake.nix": flake_nix, "README.md": readme},
+                name="E2E Test",
+                email="test@e2e.test",
+            )
+            templates[flake] = template
+        return templates[flake]
+
+    return get
+
+
 @pytest.fixture
-def e2e_project() -> Path:
+def e2e_project(_e2e_project_templates, request: pytest.FixtureRequest) -> Path:
     """Create a minimal flake project for e2e testing.
 
-    Creates a temp git repo with a valid flake.nix that:
+    Each test gets its own copy of a git repo with a valid flake.nix. The
+    default "dual-arch" flake:
     - Supports both x86_64-linux and aarch64-linux (VMs match host arch)
     - Only depends on coreutils (minimal download)
     - Has no flake-utils to reduce fetch time
 
-    Note: Uses a short temp path (/tmp/e2e-XXXX) to avoid macOS unix socket
-    path length limits (104-108 chars max).
+    Parametrize indirectly with another E2E_FLAKES name (e.g. "x86-rosetta",
+    an x86_64-only devShell) to pick a different flake.
+
+    Note: Uses a short temp path under E2E_TMP_DIR (e.g. /tmp/e2e-XXXX) to
+    avoid macOS unix socket path length limits (104-108 chars max).
     """
-    # Use short temp path to avoid macOS unix socket path limits
-    project = Path(tempfile.mkdtemp(prefix="e2e-", dir="/tmp"))
+    flake = getattr(request, "param", "dual-arch")
+    yield from _copy_project(_e2e_project_templates(flake), E2E_FLAKES[flake][2])
 
+
+def _build_diag(
+    event: dict, isolated_repo: Path, orchestrator: Orchestrator, task_id: str
+) -> str:
+    """Collect diagnostic info about a finished task for failure messages."""
+    parts = [f"Event: {event}"]
+    parts.append(f"Result: {event.get('result')}")
+    parts.append(f"Merge result: {event.get('merge_result')}")
     try:
-        # Initialize git repo with config
-        subprocess.run(
-            ["git", "init"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.email", "test@e2e.test"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "E2E Test"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-
-        # Create flake.nix
-        (project / "flake.nix").write_text(MINIMAL_FLAKE_NIX)
-
-        # Create README
-        (project / "README.md").write_text("# E2E Test Project\n")
-
-        # Initial commit
-        subprocess.run(
-            ["git", "add", "."],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Initial commit"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
+        # Check isolated repo for uncommitted files
+        if isolated_repo.exists():
+            iso_files = sample_tree(isolated_repo)
+            parts.append(f"Isolated repo files: {iso_files}")
+        log_path = orchestrator.get_task_logs(task_id).get("log_path")
+        if log_path and Path(log_path).exists():
+            parts.append(f"Logs (last 3k):\n{read_tail(log_path, 3000)}")
+    except Exception:
+        pass
+    return "\n".join(parts)
+
+
+def _reserve_worker_slots(slot_manager: SlotManager) -> None:
+    """Hold the slots of lower-numbered xdist workers in ``slot_manager``.
+
+    Slot directories under ~/.microvm-orchestrator/slots are shared by
+    every process, but each test's SlotManager is isolated and would hand
+    out slot 1. Under ``pytest -n N`` worker gwK reserves slots 1..K so its
+    VM lands on slot K+1. Without xdist nothing is reserved.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    for i in range(int(worker.removeprefix("gw"))):
+        slot_manager.acquire_slot(Path(f"/reserved/gw{i}"), f"reserved-gw{i}")
 
-        yield project
-    finally:
-        # Clean up temp directory
-        shutil.rmtree(project, ignore_errors=True)
+
+@pytest.fixture
+def orchestrator(tmp_path: Path) -> Orchestrator:
+    """A fresh Orchestrator with an isolated registry and slot manager.
+
+    The isolated registry avoids polluting the global one. A new instance per
+    test keeps a VM left over from an earlier test from reporting into this
+    test's event queue or freeing a slot in its slot manager.
+    """
+    orchestrator = Orchestrator()
+    orchestrator.registry = RepoRegistry(registry_path=tmp_path / "test-repos.json")
+    orchestrator.slot_manager = SlotManager(assignments_path=tmp_path / "test-slots.json")
+    _reserve_worker_slots(orchestrator.slot_manager)
+    return orchestrator
 
 
 @pytest.mark.slow
@@ -137,9 +215,20 @@ class TestEndToEndIntegration:
             )
         return key
 
+    @pytest.mark.parametrize(
+        "e2e_project,failure",
+        [
+            ("dual-arch", "Task did not complete."),
+            ("x86-rosetta", "x86_64 task failed (Rosetta may not be working)."),
+        ],
+        indirect=["e2e_project"],
+        ids=["dual-arch", "x86-rosetta"],
+    )
     async def test_smoke_vm_creates_file(
         self,
         e2e_project: Path,
+        failure: str,
+        orchestrator: Orchestrator,
         api_key: str,
     ) -> None:
         """Smoke test: start VM, run task, verify file creation, cleanup.
@@ -149,13 +238,11 @@ class TestEndToEndIntegration:
         2. Wait for task completion
         3. Verify the expected file was created
         4. Clean up the task
+
+        The x86-rosetta variant uses a flake with ONLY an x86_64-linux
+        devShell: on Apple Silicon, Rosetta must transparently translate
+        its binaries in the aarch64 VM for the task to complete.
         """
-        # Create orchestrator with isolated registry (avoids global registry pollution)
-        orchestrator = Orchestrator(repo_path=e2e_project)
-        isolated_dir = e2e_project / ".microvm"
-        isolated_dir.mkdir(exist_ok=True)
-        orchestrator.registry = RepoRegistry(registry_path=isolated_dir / "test-repos.json")
-        orchestrator.slot_manager = SlotManager(assignments_path=isolated_dir / "test-slots.json")
         orchestrator.registry.allow(e2e_project, alias="e2e-test")
 
         # Start task using repo alias (slot assigned automatically)
@@ -171,30 +258,10 @@ class TestEndToEndIntegration:
             repo_path = Path(task_info["repo_path"])
             isolated_repo = Path(task_info["isolated_repo_path"])
 
-            # Helper: collect diagnostic info for failure messages
-            def _diag() -> str:
-                parts = [f"Event: {event}"]
-                parts.append(f"Result: {event.get('result')}")
-                parts.append(f"Merge result: {event.get('merge_result')}")
-                # Check isolated repo for uncommitted files
-                if isolated_repo.exists():
-                    iso_files = [
-                        str(f.relative_to(isolated_repo))
-                        for f in isolated_repo.rglob("*")
-                        if f.is_file() and ".git" not in f.parts
-                    ]
-                    parts.append(f"Isolated repo files: {iso_files}")
-                try:
-                    log_path = orchestrator.get_task_logs(task_id).get("log_path")
-                    if log_path and Path(log_path).exists():
-                        parts.append(f"Logs (last 3k):\n{Path(log_path).read_text()[-3000:]}")
-                except Exception:
-                    pass
-                return "\n".join(parts)
-
             # On failure, capture logs before assertions
             if event.get("event") != "completed":
-                pytest.fail(f"Task did not complete.\n{_diag()}")
+                diag = _build_diag(event, isolated_repo, orchestrator, task_id)
+                pytest.fail(f"{failure}\n{diag}")
 
             # Verify completion
             assert event.get("event") == "completed", f"Expected 'completed', got: {event}"
@@ -203,131 +270,11 @@ class TestEndToEndIntegration:
             # Verify hello.txt was merged back to original repo
             hello_file = repo_path / "hello.txt"
             if not hello_file.exists():
-                pytest.fail(f"Expected {hello_file} to exist\n{_diag()}")
+                diag = _build_diag(event, isolated_repo, orchestrator, task_id)
+                pytest.fail(f"Expected {hello_file} to exist\n{diag}")
             content = hello_file.read_text()
             assert "integration test passed" in content, f"Unexpected content: {content}"
 
         finally:
             # Always cleanup
             await orchestrator.cleanup_task(task_id)
-
-    async def test_rosetta_x86_translation(
-        self,
-        api_key: str,
-    ) -> None:
-        """Test Rosetta x86_64 binary translation on Apple Silicon.
-
-        This test verifies that:
-        1. A flake with ONLY x86_64-linux devShell works in the aarch64 VM
-        2. Rosetta transparently translates x86_64 binaries to ARM
-        3. The task completes successfully despite architecture mismatch
-        """
-        # Create temp project with x86-only flake
-        project = Path(tempfile.mkdtemp(prefix="e2e-x86-", dir="/tmp"))
-
-        try:
-            # Initialize git repo with config
-            subprocess.run(
-                ["git", "init"],
-                cwd=project,
-                check=True,
-                capture_output=True,
-            )
-            subprocess.run(
-                ["git", "config", "user.email", "test@e2e.test"],
-                cwd=project,
-                check=True,
-                capture_output=True,
-            )
-            subprocess.run(
-                ["git", "config", "user.name", "E2E Test"],
-                cwd=project,
-                check=True,
-                capture_output=True,
-            )
-
-            # Create x86-only flake.nix
-            (project / "flake.nix").write_text(X86_ONLY_FLAKE_NIX)
-
-            # Create README
-            (project / "README.md").write_text("# E2E x86_64 Test Project\n")
-
-            # Initial commit
-            subprocess.run(
-                ["git", "add", "."],
-                cwd=project,
-                check=True,
-                capture_output=True,
-            )
-            subprocess.run(
-                ["git", "commit", "-m", "Initial commit"],
-                cwd=project,
-                check=True,
-                capture_output=True,
-            )
-
-            # Create orchestrator with isolated registry (avoids global registry pollution)
-            orchestrator = Orchestrator(repo_path=project)
-            isolated_dir = project / ".microvm"
-            isolated_dir.mkdir(exist_ok=True)
-            orchestrator.registry = RepoRegistry(registry_path=isolated_dir / "test-repos.json")
-            orchestrator.slot_manager = SlotManager(assignments_path=isolated_dir / "test-slots.json")
-            orchestrator.registry.allow(project, alias="x86-test")
-
-            # Start task using repo alias (slot assigned automatically)
-            result = await orchestrator.run_task(TASK_DESCRIPTION, repo="x86-test")
-            task_id = result["task_id"]
-
-            try:
-                # Wait for completion (5 minute timeout)
-                event = await orchestrator.wait_next_event(timeout_ms=300_000)
-
-                # Get task info for debugging
-                task_info = orchestrator.get_task_info(task_id)
-                repo_path = Path(task_info["repo_path"])
-                isolated_repo = Path(task_info["isolated_repo_path"])
-
-                # Helper: collect diagnostic info for failure messages
-                def _diag() -> str:
-                    parts = [f"Event: {event}"]
-                    parts.append(f"Result: {event.get('result')}")
-                    parts.append(f"Merge result: {event.get('merge_result')}")
-                    if isolated_repo.exists():
-                        iso_files = [
-                            str(f.relative_to(isolated_repo))
-                            for f in isolated_repo.rglob("*")
-                            if f.is_file() and ".git" not in f.parts
-                        ]
-                        parts.append(f"Isolated repo files: {iso_files}")
-                    try:
-                        log_path = orchestrator.get_task_logs(task_id).get("log_path")
-                        if log_path and Path(log_path).exists():
-                            parts.append(f"Logs (last 3k):\n{Path(log_path).read_text()[-3000:]}")
-                    except Exception:
-                        pass
-                    return "\n".join(parts)
-
-                # On failure, capture logs before assertions
-                if event.get("event") != "completed":
-                    pytest.fail(
-                        f"x86_64 task failed (Rosetta may not be working).\n{_diag()}"
-                    )
-
-                # Verify completion
-                assert event.get("event") == "completed", f"Expected 'completed', got: {event}"
-                assert event.get("exit_code") == 0, f"Expected exit_code 0, got: {event.get('exit_code')}"
-
-                # Verify hello.txt was merged back to original repo
-                hello_file = repo_path / "hello.txt"
-                if not hello_file.exists():
-                    pytest.fail(f"Expected {hello_file} to exist\n{_diag()}")
-                content = hello_file.read_text()
-                assert "integration test passed" in content, f"Unexpected content: {content}"
-
-            finally:
-                # Always cleanup
-                await orchestrator.cleanup_task(task_id)
-
-        finally:
-            # Clean up temp directory
-            shutil.rmtree(project, ignore_errors=True)
@@ -67,6 +67,72 @@ class TestBasicQueueOperations:
         assert event_queue._try_pop() is event3
         assert event_queue._try_pop() is None
 
+    def test_emit_many_wakes_waiter(
+        self, event_queue: EventQueue, frozen_time: datetime
+    ):
+        """emit_many() queues events in order and wakes a blocked wait()."""
+        events = [
+            TaskEvent(task_id=f"task-{i}", event_type=EventType.COMPLETED, timestamp=frozen_time)
+            for i in range(3)
+        ]
+        thread = threading.Thread(target=event_queue.emit_many, args=(events,))
+        thread.start()
+
+        first = event_queue.wait(timeout_ms=1000)
+        thread.join()
+
+        assert first is events[0]
+        assert event_queue.drain() == events[1:]
+
+    def test_drain_returns_all_in_order(
+        self, event_queue: EventQueue, frozen_time: datetime
+    ):
+        """drain() empties the queue, returning events in FIFO order."""
+        events = [
+            TaskEvent(task_id=f"task-{i}", event_type=EventType.COMPLETED, timestamp=frozen_time)
+            for i in range(3)
+        ]
+        for event in events:
+            event_queue.emit(event)
+
+        assert len(event_queue) == 3
+        assert event_queue.drain() == events
+        assert len(event_queue) == 0
+        assert event_queue.drain() == []
+        assert event_queue._try_pop() is None
+
+
+@pytest.mark.benchmark(group="eventqueue")
+class TestQueueThroughput:
+    """Emit/pop cost over many events, for comparing runs with --benchmark-compare.
+
+    Skipped unless run with --benchmark-only. The time limit is generous so
+    slow machines pass, but an O(N^2) emit/pop path or lock contention would
+    take seconds and fail it.
+    """
+
+    NUM_EVENTS = 10_000
+    MAX_SECONDS = 1.0
+
+    def test_emit_then_drain(
+        self, benchmark, event_queue: EventQueue, sample_completed_event: TaskEvent
+    ):
+        """10k emits followed by 10k pops return every event."""
+        def emit_then_drain() -> int:
+            for _ in range(self.NUM_EVENTS):
+                event_queue.emit(sample_completed_event)
+            drained = 0
+            while event_queue._try_pop() is not None:
+                drained += 1
+            return drained
+
+        drained = benchmark.pedantic(emit_then_drain, rounds=5, iterations=1)
+
+        assert drained == self.NUM_EVENTS
+        # stats is None when benchmarking is disabled (--benchmark-disable, xdist)
+        if benchmark.stats is not None:
+            assert benchmark.stats.stats.max < self.MAX_SECONDS
+
 
 # =============================================================================
 # Synchronous Wait Tests
@@ -141,6 +207,17 @@ class TestAsyncWait:
         # Should have waited approximately 50ms
         assert 0.04 <= elapsed <= 0.2
 
+    @pytest.mark.asyncio
+    async def test_wait_async_zero_timeout(
+        self, event_queue: EventQueue, sample_completed_event: TaskEvent
+    ):
+        """timeout_ms=0 polls once: a queued event, otherwise None at once."""
+        assert await event_queue.wait_async(timeout_ms=0) is None
+
+        event_queue.emit(sample_completed_event)
+
+        assert await event_queue.wait_async(timeout_ms=0) is sample_completed_event
+
     @pytest.mark.asyncio
     async def test_wait_async_cancellation(self, event_queue: EventQueue):
         """CancelledError propagates correctly."""
@@ -158,12 +235,16 @@ class TestAsyncWait:
         self, event_queue: EventQueue, sample_completed_event: TaskEvent
     ):
         """Async wait returns event that arrives during wait period."""
-        async def emit_after_delay():
-            await asyncio.sleep(0.02)  # 20ms delay
+        waiting = asyncio.Event()
+
+        async def emit_when_waiting():
+            # Only runs once wait_async() below has suspended
+            await waiting.wait()
             event_queue.emit(sample_completed_event)
 
-        emit_task = asyncio.create_task(emit_after_delay())
+        emit_task = asyncio.create_task(emit_when_waiting())
 
+        waiting.set()
         result = await event_queue.wait_async(timeout_ms=1000)
         await emit_task
 
@@ -178,39 +259,53 @@ class TestAsyncWait:
 class TestThreadSafety:
     """Tests for thread-safe operations."""
 
-    def test_thread_safe_emission(self, event_queue: EventQueue, frozen_time: datetime):
-        """Multiple threads emitting events concurrently."""
+    @pytest.mark.parametrize("batched", [False, True], ids=["emit", "emit_many"])
+    def test_thread_safe_emission(
+        self, event_queue: EventQueue, frozen_time: datetime, batched: bool
+    ):
+        """Multiple threads emitting events concurrently, singly or in batches."""
         num_threads = 10
         events_per_thread = 100
 
-        def emit_events(thread_id: int):
-            for i in range(events_per_thread):
-                event = TaskEvent(
+        # Build events up front so the threads only contend on emit()
+        batches = [
+            [
+                TaskEvent(
                     task_id=f"task-{thread_id}-{i}",
                     event_type=EventType.COMPLETED,
                     timestamp=frozen_time,
                 )
+                for i in range(events_per_thread)
+            ]
+            for thread_id in range(num_threads)
+        ]
+
+        def emit_events(batch: list[TaskEvent]):
+            if batched:
+                event_queue.emit_many(batch)
+                return
+            for event in batch:
                 event_queue.emit(event)
 
         # Emit from multiple threads
         with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-            futures = [executor.submit(emit_events, i) for i in range(num_threads)]
+            futures = [executor.submit(emit_events, batch) for batch in batches]
             concurrent.futures.wait(futures)
 
-        # Count events
-        count = 0
-        while event_queue._try_pop() is not None:
-            count += 1
+        assert len(event_queue) == num_threads * events_per_thread
 
-        assert count == num_threads * events_per_thread
+        drained = event_queue.drain()
+        # Each thread's events stay in order relative to each other
+        for thread_id, batch in enumerate(batches):
+            prefix = f"task-{thread_id}-"
+            assert [e for e in drained if e.task_id.startswith(prefix)] == batch
 
     def test_concurrent_emit_and_pop(self, event_queue: EventQueue, frozen_time: datetime):
         """Concurrent emitting and popping is thread-safe."""
         num_events = 1000
+        # Each list has a single writer thread, so neither needs a lock
         emitted = []
         popped = []
-        emit_lock = threading.Lock()
-        pop_lock = threading.Lock()
 
         def emit_events():
             for i in range(num_events):
@@ -220,19 +315,15 @@ class TestThreadSafety:
                     timestamp=frozen_time,
                 )
                 event_queue.emit(event)
-                with emit_lock:
-                    emitted.append(event.task_id)
+                emitted.append(event.task_id)
 
         def pop_events():
-            while True:
-                event = event_queue._try_pop()
-                if event:
-                    with pop_lock:
-                        popped.append(event.task_id)
-                elif len(popped) >= num_events:
+            # wait() blocks on the queue's condition until emit() notifies it
+            for _ in range(num_events):
+                event = event_queue.wait(timeout_ms=5000)
+                if event is None:
                     break
-                else:
-                    time.sleep(0.001)
+                popped.append(event.task_id)
 
         emit_thread = threading.Thread(target=emit_events)
         pop_thread = threading.Thread(target=pop_events)
@@ -244,7 +335,8 @@ class TestThreadSafety:
         pop_thread.join(timeout=5)
 
         assert len(popped) == num_events
-        assert set(emitted) == set(popped)
+        # A single producer means FIFO order is preserved end to end
+        assert popped == emitted
 
 
 # =============================================================================
@@ -269,19 +361,21 @@ class TestMultipleWaiters:
             timestamp=frozen_time,
         )
 
-        # Start two waiters
-        waiter1 = asyncio.create_task(event_queue.wait_async(timeout_ms=1000))
-        waiter2 = asyncio.create_task(event_queue.wait_async(timeout_ms=1000))
+        async with asyncio.TaskGroup() as tg:
+            # Start two waiters
+            waiter1 = tg.create_task(event_queue.wait_async(timeout_ms=1000))
+            waiter2 = tg.create_task(event_queue.wait_async(timeout_ms=1000))
 
-        # Give waiters time to start
-        await asyncio.sleep(0.01)
+            # One loop pass runs both waiters up to their wait on the queue's
+            # asyncio.Event (tasks start in creation order), no timer needed
+            await asyncio.sleep(0)
 
-        # Emit two events
-        event_queue.emit(event1)
-        event_queue.emit(event2)
+            # Emit two events
+            event_queue.emit(event1)
+            event_queue.emit(event2)
 
         # Both waiters should get events
-        results = await asyncio.gather(waiter1, waiter2)
+        results = [waiter1.result(), waiter2.result()]
 
         assert len(results) == 2
         assert event1 in results
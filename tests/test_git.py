@@ -18,7 +18,40 @@ from microvm_orchestrator.core.git import (
     cleanup_task_ref,
 )
 
-from .fixtures.mocks import SubprocessMock
+from .fixtures.mocks import MockCompletedProcess, SubprocessMock
+
+
+# Fixed git argv, shared by the responses and call assertions below
+REV_PARSE_HEAD = ("rev-parse", "HEAD")
+SYMBOLIC_REF_HEAD = ("symbolic-ref", "--short", "HEAD")
+
+
+def _delete_ref(ref: str) -> tuple[str, ...]:
+    """git argv that deletes ref (as run by cleanup_task_ref)."""
+    return ("update-ref", "-d", ref)
+
+
+def _isolated_repo_responses(
+    original_repo: Path, task_id: str, start_ref: str
+) -> dict[tuple[str, ...], MockCompletedProcess]:
+    """Responses for every git command of a successful setup_isolated_repo.
+
+    Install with subprocess_mock.set_responses(); tests then override only
+    the commands their scenario changes.
+    """
+    commands = {
+        REV_PARSE_HEAD: f"{start_ref}\n",
+        ("init", "--quiet"): "",
+        ("remote", "add", "origin", str(original_repo)): "",
+        ("fetch", "origin", "--quiet"): "",
+        ("checkout", "-b", f"task-{task_id}", start_ref, "--quiet"): "",
+        ("config", "user.email", f"claude-task-{task_id}@microvm.local"): "",
+        ("config", "user.name", f"Claude Task ({task_id})"): "",
+    }
+    return {
+        ("git", *args): MockCompletedProcess(args=("git", *args), stdout=stdout)
+        for args, stdout in commands.items()
+    }
 
 
 # =============================================================================
@@ -29,19 +62,42 @@ from .fixtures.mocks import SubprocessMock
 class TestRunGit:
     """Tests for the run_git subprocess wrapper."""
 
-    def test_run_git_success(self, tmp_path: Path, subprocess_mock: SubprocessMock):
-        """run_git returns CompletedProcess on success."""
+    @pytest.mark.parametrize(
+        "args,returncode,stdout,stderr,kwargs,stream,expected",
+        [
+            # Default check=True does not raise on success
+            (["status"], 0, "On branch main\nnothing to commit\n", "", {}, "stdout",
+             "On branch main"),
+            (["push"], 1, "", "error: failed to push\n", {"check": False}, "stderr",
+             "failed to push"),
+        ],
+        ids=["success", "failure-no-check"],
+    )
+    def test_run_git_returns_result(
+        self,
+        tmp_path: Path,
+        subprocess_mock: SubprocessMock,
+        args: list[str],
+        returncode: int,
+        stdout: str,
+        stderr: str,
+        kwargs: dict,
+        stream: str,
+        expected: str,
+    ):
+        """run_git returns CompletedProcess on success, or on failure with check=False."""
         subprocess_mock.set_git_response(
-            ["status"],
-            returncode=0,
-            stdout="On branch main\nnothing to commit\n",
+            args,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
         )
 
-        result = run_git(["status"], tmp_path)
+        result = run_git(args, tmp_path, **kwargs)
 
-        assert result.returncode == 0
-        assert "On branch main" in result.stdout
-        assert ["git", "status"] in subprocess_mock.calls
+        assert result.returncode == returncode
+        assert expected in getattr(result, stream)
+        assert ("git", *args) in subprocess_mock.calls
 
     def test_run_git_failure(self, tmp_path: Path, subprocess_mock: SubprocessMock):
         """run_git raises CalledProcessError on non-zero exit with check=True."""
@@ -56,19 +112,6 @@ class TestRunGit:
 
         assert exc_info.value.returncode == 1
 
-    def test_run_git_failure_no_check(self, tmp_path: Path, subprocess_mock: SubprocessMock):
-        """run_git returns result without raising when check=False."""
-        subprocess_mock.set_git_response(
-            ["push"],
-            returncode=1,
-            stderr="error: failed to push\n",
-        )
-
-        result = run_git(["push"], tmp_path, check=False)
-
-        assert result.returncode == 1
-        assert "failed to push" in result.stderr
-
 
 # =============================================================================
 # get_current_ref Tests
@@ -81,14 +124,14 @@ class TestGetCurrentRef:
     def test_get_current_ref(self, tmp_path: Path, subprocess_mock: SubprocessMock):
         """get_current_ref returns HEAD commit hash."""
         subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
+            REV_PARSE_HEAD,
             stdout="abc123def456789012345678901234567890abcd\n",
         )
 
         result = get_current_ref(tmp_path)
 
         assert result == "abc123def456789012345678901234567890abcd"
-        assert ["git", "rev-parse", "HEAD"] in subprocess_mock.calls
+        assert ("git", *REV_PARSE_HEAD) in subprocess_mock.calls
 
 
 # =============================================================================
@@ -99,29 +142,35 @@ class TestGetCurrentRef:
 class TestGetCurrentBranch:
     """Tests for get_current_branch function."""
 
-    def test_get_current_branch(self, tmp_path: Path, subprocess_mock: SubprocessMock):
-        """get_current_branch returns branch name when on a branch."""
-        subprocess_mock.set_git_response(
-            ["symbolic-ref", "--short", "HEAD"],
-            stdout="main\n",
-        )
-
-        result = get_current_branch(tmp_path)
-
-        assert result == "main"
-        assert ["git", "symbolic-ref", "--short", "HEAD"] in subprocess_mock.calls
-
-    def test_get_current_branch_detached(self, tmp_path: Path, subprocess_mock: SubprocessMock):
-        """get_current_branch returns None when HEAD is detached."""
+    @pytest.mark.parametrize(
+        "returncode,stdout,stderr,expected",
+        [
+            (0, "main\n", "", "main"),
+            (128, "", "fatal: ref HEAD is not a symbolic ref\n", None),
+        ],
+        ids=["on-branch", "detached"],
+    )
+    def test_get_current_branch(
+        self,
+        tmp_path: Path,
+        subprocess_mock: SubprocessMock,
+        returncode: int,
+        stdout: str,
+        stderr: str,
+        expected: str | None,
+    ):
+        """get_current_branch returns the branch name, or None when HEAD is detached."""
         subprocess_mock.set_git_response(
-            ["symbolic-ref", "--short", "HEAD"],
-            returncode=128,
-            stderr="fatal: ref HEAD is not a symbolic ref\n",
+            SYMBOLIC_REF_HEAD,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
         )
 
         result = get_current_branch(tmp_path)
 
-        assert result is None
+        assert result == expected
+        assert ("git", *SYMBOLIC_REF_HEAD) in subprocess_mock.calls
 
 
 # =============================================================================
@@ -140,21 +189,8 @@ class TestSetupIsolatedRepo:
         task_id = "test-task-123"
 
         # Set up mock responses for the git commands
-        subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
-            stdout="abc123def456\n",
-        )
-        subprocess_mock.set_git_response(["init", "--quiet"])
-        subprocess_mock.set_git_response(["remote", "add", "origin", str(original_repo)])
-        subprocess_mock.set_git_response(["fetch", "origin", "--quiet"])
-        subprocess_mock.set_git_response(
-            ["checkout", "-b", f"task-{task_id}", "abc123def456", "--quiet"]
-        )
-        subprocess_mock.set_git_response(
-            ["config", "user.email", f"claude-task-{task_id}@microvm.local"]
-        )
-        subprocess_mock.set_git_response(
-            ["config", "user.name", f"Claude Task ({task_id})"]
+        subprocess_mock.set_responses(
+            _isolated_repo_responses(original_repo, task_id, "abc123def456")
         )
         subprocess_mock.set_default(returncode=0)
 
@@ -163,8 +199,8 @@ class TestSetupIsolatedRepo:
         assert result == "abc123def456"
         assert task_repo.exists()
         # Verify key git commands were called
-        assert ["git", "init", "--quiet"] in subprocess_mock.calls
-        assert ["git", "fetch", "origin", "--quiet"] in subprocess_mock.calls
+        assert ("git", "init", "--quiet") in subprocess_mock.calls
+        assert ("git", "fetch", "origin", "--quiet") in subprocess_mock.calls
 
     def test_setup_isolated_repo_fetch_failure_fallback(
         self, tmp_git_repos: tuple[Path, Path], subprocess_mock: SubprocessMock
@@ -173,12 +209,9 @@ class TestSetupIsolatedRepo:
         original_repo, task_repo = tmp_git_repos
         task_id = "test-task-456"
 
-        subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
-            stdout="def789abc123\n",
+        subprocess_mock.set_responses(
+            _isolated_repo_responses(original_repo, task_id, "def789abc123")
         )
-        subprocess_mock.set_git_response(["init", "--quiet"])
-        subprocess_mock.set_git_response(["remote", "add", "origin", str(original_repo)])
         # fetch fails
         subprocess_mock.set_git_response(
             ["fetch", "origin", "--quiet"],
@@ -198,21 +231,15 @@ class TestSetupIsolatedRepo:
         subprocess_mock.set_git_response(
             ["checkout", "-b", f"task-{task_id}", "--quiet"]
         )
-        subprocess_mock.set_git_response(
-            ["config", "user.email", f"claude-task-{task_id}@microvm.local"]
-        )
-        subprocess_mock.set_git_response(
-            ["config", "user.name", f"Claude Task ({task_id})"]
-        )
         subprocess_mock.set_default(returncode=0)
 
         result = setup_isolated_repo(original_repo, task_repo, task_id)
 
         assert result == "def789abc123"
         # Verify archive fallback commands were called
-        assert ["git", "archive", "HEAD"] in subprocess_mock.calls
-        assert ["tar", "-x"] in subprocess_mock.calls
-        assert ["git", "add", "-A"] in subprocess_mock.calls
+        assert ("git", "archive", "HEAD") in subprocess_mock.calls
+        assert ("tar", "-x") in subprocess_mock.calls
+        assert ("git", "add", "-A") in subprocess_mock.calls
 
     async def test_setup_isolated_repo_async(
         self, tmp_git_repos: tuple[Path, Path], subprocess_mock: SubprocessMock
@@ -221,21 +248,8 @@ class TestSetupIsolatedRepo:
         original_repo, task_repo = tmp_git_repos
         task_id = "async-task"
 
-        subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
-            stdout="async123\n",
-        )
-        subprocess_mock.set_git_response(["init", "--quiet"])
-        subprocess_mock.set_git_response(["remote", "add", "origin", str(original_repo)])
-        subprocess_mock.set_git_response(["fetch", "origin", "--quiet"])
-        subprocess_mock.set_git_response(
-            ["checkout", "-b", f"task-{task_id}", "async123", "--quiet"]
-        )
-        subprocess_mock.set_git_response(
-            ["config", "user.email", f"claude-task-{task_id}@microvm.local"]
-        )
-        subprocess_mock.set_git_response(
-            ["config", "user.name", f"Claude Task ({task_id})"]
+        subprocess_mock.set_responses(
+            _isolated_repo_responses(original_repo, task_id, "async123")
         )
         subprocess_mock.set_default(returncode=0)
 
@@ -272,17 +286,17 @@ class TestMergeTaskCommits:
         )
         # Current HEAD matches start_ref
         subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
+            REV_PARSE_HEAD,
             stdout=f"{start_ref}\n",
         )
         subprocess_mock.set_git_response(
-            ["symbolic-ref", "--short", "HEAD"],
+            SYMBOLIC_REF_HEAD,
             stdout="main\n",
         )
         # Fast-forward succeeds
         subprocess_mock.set_git_response(["merge", "--ff-only", task_ref])
         # Cleanup ref
-        subprocess_mock.set_git_response(["update-ref", "-d", task_ref])
+        subprocess_mock.set_git_response(_delete_ref(task_ref))
         subprocess_mock.set_default(returncode=0)
 
         result = merge_task_commits(original_repo, task_repo, task_id, start_ref)
@@ -357,11 +371,11 @@ class TestMergeTaskCommits:
         )
         # HEAD has moved (different from start_ref)
         subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
+            REV_PARSE_HEAD,
             stdout=f"{current_head}\n",
         )
         subprocess_mock.set_git_response(
-            ["symbolic-ref", "--short", "HEAD"],
+            SYMBOLIC_REF_HEAD,
             stdout="main\n",
         )
         # Create rebase branch
@@ -376,7 +390,7 @@ class TestMergeTaskCommits:
         subprocess_mock.set_git_response(["merge", "--ff-only", f"rebase-{task_id}"])
         # Cleanup
         subprocess_mock.set_git_response(["branch", "-d", f"rebase-{task_id}"])
-        subprocess_mock.set_git_response(["update-ref", "-d", task_ref])
+        subprocess_mock.set_git_response(_delete_ref(task_ref))
         subprocess_mock.set_default(returncode=0)
 
         result = merge_task_commits(original_repo, task_repo, task_id, start_ref)
@@ -403,11 +417,11 @@ class TestMergeTaskCommits:
             stdout="1\n",
         )
         subprocess_mock.set_git_response(
-            ["rev-parse", "HEAD"],
+            REV_PARSE_HEAD,
             stdout=f"{current_head}\n",
         )
         subprocess_mock.set_git_response(
-            ["symbolic-ref", "--short", "HEAD"],
+            SYMBOLIC_REF_HEAD,
             stdout="main\n",
         )
         subprocess_mock.set_git_response(
@@ -454,12 +468,12 @@ class TestCleanupTaskRef:
         task_id = "cleanup-task"
         task_ref = f"refs/tasks/{task_id}"
 
-        subprocess_mock.set_git_response(["update-ref", "-d", task_ref])
+        subprocess_mock.set_git_response(_delete_ref(task_ref))
 
         result = cleanup_task_ref(tmp_path, task_id)
 
         assert result is True
-        assert ["git", "update-ref", "-d", task_ref] in subprocess_mock.calls
+        assert ("git", *_delete_ref(task_ref)) in subprocess_mock.calls
 
     def test_cleanup_task_ref_not_found(
         self, tmp_path: Path, subprocess_mock: SubprocessMock
@@ -469,7 +483,7 @@ class TestCleanupTaskRef:
         task_ref = f"refs/tasks/{task_id}"
 
         subprocess_mock.set_git_response(
-            ["update-ref", "-d", task_ref],
+            _delete_ref(task_ref),
             returncode=1,
             stderr="error: cannot lock ref\n",
         )
@@ -487,56 +501,57 @@ class TestCleanupTaskRef:
 class TestMergeResult:
     """Tests for MergeResult dataclass."""
 
-    def test_merge_result_to_dict_success(self):
-        """MergeResult.to_dict serializes successful merge."""
-        result = MergeResult(
-            merged=True,
-            method="fast-forward",
-            commits=5,
-        )
-
-        d = result.to_dict()
-
-        assert d == {
-            "merged": True,
-            "method": "fast-forward",
-            "commits": 5,
-            "conflicts": [],
-            "reason": None,
-            "task_ref": None,
-        }
-
-    def test_merge_result_to_dict_conflict(self):
-        """MergeResult.to_dict serializes conflict result."""
-        result = MergeResult(
-            merged=False,
-            reason="conflicts",
-            conflicts=["file1.py", "file2.py"],
-            task_ref="refs/tasks/abc123",
-            commits=2,
-        )
-
-        d = result.to_dict()
-
-        assert d == {
-            "merged": False,
-            "method": None,
-            "commits": 2,
-            "conflicts": ["file1.py", "file2.py"],
-            "reason": "conflicts",
-            "task_ref": "refs/tasks/abc123",
-        }
-
-    def test_merge_result_defaults(self):
-        """MergeResult initializes with proper defaults."""
-        result = MergeResult(merged=True)
-
-        assert result.merged is True
-        assert result.method is None
-        assert result.commits == 0
-        assert result.conflicts == []
-        assert result.reason is None
-        assert result.task_ref is None
+    @pytest.mark.parametrize(
+        "kwargs,expected",
+        [
+            pytest.param(
+                {"merged": True, "method": "fast-forward", "commits": 5},
+                {
+                    "merged": True,
+                    "method": "fast-forward",
+                    "commits": 5,
+                    "conflicts": [],
+                    "reason": None,
+                    "task_ref": None,
+                },
+                id="success",
+            ),
+            pytest.param(
+                {
+                    "merged": False,
+                    "reason": "conflicts",
+                    "conflicts": ["file1.py", "file2.py"],
+                    "task_ref": "refs/tasks/abc123",
+                    "commits": 2,
+                },
+                {
+                    "merged": False,
+                    "method": None,
+                    "commits": 2,
+                    "conflicts": ["file1.py", "file2.py"],
+                    "reason": "conflicts",
+                    "task_ref": "refs/tasks/abc123",
+                },
+                id="conflict",
+            ),
+            # Every optional field falls back to its default
+            pytest.param(
+                {"merged": True},
+                {
+                    "merged": True,
+                    "method": None,
+                    "commits": 0,
+                    "conflicts": [],
+                    "reason": None,
+                    "task_ref": None,
+                },
+                id="defaults",
+            ),
+        ],
+    )
+    def test_merge_result_to_dict(self, kwargs: dict, expected: dict):
+        """MergeResult.to_dict serializes every field, defaults included."""
+        assert MergeResult(**kwargs).to_dict() == expected
 
     def test_merge_result_conflicts_not_shared(self):
         """MergeResult conflicts list is not shared between instances."""
@@ -41,7 +41,7 @@ class TestMocksWork:
         """SubprocessMock records called commands."""
         import subprocess
         subprocess.run(["echo", "hello"])
-        assert ["echo", "hello"] in subprocess_mock.calls
+        assert ("echo", "hello") in subprocess_mock.calls
 
     def test_subprocess_mock_returns_configured_response(self, subprocess_mock):
         """SubprocessMock returns configured response."""
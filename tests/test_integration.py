@@ -12,7 +12,6 @@ from unittest.mock import patch
 
 import pytest
 
-from microvm_orchestrator.core.git import MergeResult
 from microvm_orchestrator.core.registry import RepoRegistry
 from microvm_orchestrator.core.slots import SlotManager
 from microvm_orchestrator.tools import Orchestrator, ToolError
@@ -51,12 +50,28 @@ def multi_repo_orchestrator(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
     orch.registry = RepoRegistry(registry_path=registry_path)
     orch.slot_manager = SlotManager(assignments_path=slots_path)
 
-    orch.registry.allow(repo_a, alias="repo-a")
-    orch.registry.allow(repo_b, alias="repo-b")
+    with orch.registry.batch():
+        orch.registry.allow(repo_a, alias="repo-a")
+        orch.registry.allow(repo_b, alias="repo-b")
 
     return orch, repo_a, repo_b
 
 
+@pytest.fixture
+async def two_running_tasks(multi_repo_orchestrator, mock_orchestrator_deps):
+    """Start "Task A" on repo-a and "Task B" on repo-b.
+
+    Returns (orch, result_a, result_b, repo_a, repo_b), where the results
+    are the run_task return values.
+    """
+    orch, repo_a, repo_b = multi_repo_orchestrator
+
+    result_a = await orch.run_task("Task A", repo="repo-a")
+    result_b = await orch.run_task("Task B", repo="repo-b")
+
+    return orch, result_a, result_b, repo_a, repo_b
+
+
 # =============================================================================
 # Multi-Repo Task Tests
 # =============================================================================
@@ -66,14 +81,9 @@ def multi_repo_orchestrator(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
 class TestMultiRepoTasks:
     """Tests for running tasks across multiple registered repos."""
 
-    async def test_run_tasks_on_two_repos_assigns_different_slots(
-        self, multi_repo_orchestrator, mock_orchestrator_deps
-    ):
+    async def test_run_tasks_on_two_repos_assigns_different_slots(self, two_running_tasks):
         """Tasks on different repos get assigned different slots."""
-        orch, repo_a, repo_b = multi_repo_orchestrator
-
-        result_a = await orch.run_task("Task A", repo="repo-a")
-        result_b = await orch.run_task("Task B", repo="repo-b")
+        orch, result_a, result_b, repo_a, repo_b = two_running_tasks
 
         assert "task_id" in result_a
         assert "task_id" in result_b
@@ -86,14 +96,9 @@ class TestMultiRepoTasks:
         assert info_a["repo_path"] == str(repo_a)
         assert info_b["repo_path"] == str(repo_b)
 
-    async def test_tasks_run_in_correct_repos(
-        self, multi_repo_orchestrator, mock_orchestrator_deps
-    ):
+    async def test_tasks_run_in_correct_repos(self, two_running_tasks):
         """Each task's paths point to the correct repo."""
-        orch, repo_a, repo_b = multi_repo_orchestrator
-
-        result_a = await orch.run_task("Task A", repo="repo-a")
-        result_b = await orch.run_task("Task B", repo="repo-b")
+        orch, result_a, result_b, repo_a, repo_b = two_running_tasks
 
         info_a = orch.get_task_info(result_a["task_id"])
         info_b = orch.get_task_info(result_b["task_id"])
@@ -103,16 +108,16 @@ class TestMultiRepoTasks:
         assert info_b["repo_path"] == str(repo_b)
 
         # isolated_repo_path should be under the correct repo's .microvm/tasks/
-        assert str(repo_a) in info_a["isolated_repo_path"]
-        assert str(repo_b) in info_b["isolated_repo_path"]
+        assert Path(info_a["isolated_repo_path"]).is_relative_to(repo_a / ".microvm" / "tasks")
+        assert Path(info_b["isolated_repo_path"]).is_relative_to(repo_b / ".microvm" / "tasks")
 
         # task.json should be saved under the correct repo
         task_a = orch._tasks[result_a["task_id"]]
         task_b = orch._tasks[result_b["task_id"]]
         assert task_a.task_json_path.exists()
         assert task_b.task_json_path.exists()
-        assert str(repo_a) in str(task_a.task_json_path)
-        assert str(repo_b) in str(task_b.task_json_path)
+        assert task_a.task_json_path.is_relative_to(repo_a)
+        assert task_b.task_json_path.is_relative_to(repo_b)
 
     async def test_unknown_repo_returns_error(
         self, multi_repo_orchestrator, mock_orchestrator_deps
@@ -177,26 +182,21 @@ class TestMultiRepoTasks:
 
         assert len(orch.slot_manager.get_active_tasks()) == 1
 
-        # Simulate task exit
-        with patch("microvm_orchestrator.tools.merge_task_commits") as mock_merge:
-            mock_merge.return_value = MergeResult(merged=True, method="fast-forward", commits=1)
-            orch._on_task_exit(task, exit_code=0)
+        # Simulate task exit; without a successful result.json there is
+        # nothing to merge (merge_task_commits is patched by the deps fixture)
+        orch._on_task_exit(task, exit_code=0)
 
         assert len(orch.slot_manager.get_active_tasks()) == 0
+        mock_orchestrator_deps["merge"].assert_not_called()
 
         # Run another task on the same repo — should get the same slot (affinity)
         result2 = await orch.run_task("Task A2", repo="repo-a")
         task2 = orch._tasks[result2["task_id"]]
         assert task2.slot == original_slot
 
-    async def test_task_lookup_across_repos(
-        self, multi_repo_orchestrator, mock_orchestrator_deps
-    ):
+    async def test_task_lookup_across_repos(self, two_running_tasks):
         """get_task_info correctly finds tasks across different repos."""
-        orch, repo_a, repo_b = multi_repo_orchestrator
-
-        result_a = await orch.run_task("Task A", repo="repo-a")
-        result_b = await orch.run_task("Task B", repo="repo-b")
+        orch, result_a, result_b, repo_a, repo_b = two_running_tasks
 
         # Both should be retrievable
         info_a = orch.get_task_info(result_a["task_id"])
@@ -209,6 +209,10 @@ class TestMultiRepoTasks:
 
         # Clear in-memory cache — force disk lookup via _get_task
         orch._tasks.clear()
+        task_result = {"success": True, "summary": "done"}
+        (repo_a / ".microvm" / "tasks" / result_a["task_id"] / "result.json").write_text(
+            json.dumps(task_result)
+        )
 
         info_a_disk = orch.get_task_info(result_a["task_id"])
         info_b_disk = orch.get_task_info(result_b["task_id"])
@@ -217,3 +221,16 @@ class TestMultiRepoTasks:
         assert info_b_disk["task_id"] == result_b["task_id"]
         assert info_a_disk["repo_path"] == str(repo_a)
         assert info_b_disk["repo_path"] == str(repo_b)
+        assert info_a_disk["result"] == task_result
+        assert "result" not in info_b_disk
+
+        # Batch disk lookup via _get_tasks skips unknown IDs
+        orch._tasks.clear()
+
+        tasks = orch._get_tasks([result_a["task_id"], result_b["task_id"], "missing"])
+
+        assert set(tasks) == {result_a["task_id"], result_b["task_id"]}
+        assert tasks[result_a["task_id"]].repo_path == repo_a
+        assert tasks[result_b["task_id"]].repo_path == repo_b
+        # Loaded tasks are cached for later lookups
+        assert orch._tasks.keys() == tasks.keys()
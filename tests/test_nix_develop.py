@@ -5,7 +5,6 @@ from __future__ import annotations
 import os
 import re
 import shutil
-import subprocess
 import tempfile
 from pathlib import Path
 
@@ -13,6 +12,9 @@ import pytest
 
 from microvm_orchestrator.tools import Orchestrator
 
+from .fixtures.fast_git import init_repo
+from .fixtures.helpers import read_tail, rmtree_in_background, sample_tree
+
 
 BUN_FLAKE_NIX = """\
 {
@@ -52,6 +54,24 @@ COWSAY_BASE_FLAKE_NIX = """\
 }
 """
 
+HAS_NIX = shutil.which("nix") is not None
+HAS_API_KEY = bool(
+    os.environ.get("CLAUDE_CODE_OAUTH_TOKEN") or os.environ.get("ANTHROPIC_API_KEY")
+)
+
+# Fixture files, encoded once (init_repo writes bytes without a codec pass)
+BUN_PROJECT_FILES = {
+    "flake.nix": BUN_FLAKE_NIX.encode("ascii"),
+    "README.md": b"# Nix Develop Bun Test Project\n",
+}
+COWSAY_BASE_PROJECT_FILES = {
+    "flake.nix": COWSAY_BASE_FLAKE_NIX.encode("ascii"),
+    "README.md": b"# Nix Develop Minimal Test Project\n",
+}
+
+# A semver-style version, as printed by `bun --version`
+VERSION_RE = re.compile(r"\d+\.\d+\.\d+")
+
 TASK_BUN_VERSION = """
 Run 'bun --version' and write the output to version.txt.
 Then write result.json with {"success": true, "version": "<the version you found>"}.
@@ -85,50 +105,17 @@ def bun_flake_project() -> Path:
     project = Path(tempfile.mkdtemp(prefix="nix-bun-", dir="/tmp"))
 
     try:
-        # Initialize git repo with config
-        subprocess.run(
-            ["git", "init"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.email", "test@nixdev.test"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Nix Develop Test"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-
-        # Create flake.nix with bun
-        (project / "flake.nix").write_text(BUN_FLAKE_NIX)
-
-        # Create README
-        (project / "README.md").write_text("# Nix Develop Bun Test Project\n")
-
-        # Initial commit
-        subprocess.run(
-            ["git", "add", "."],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Initial commit"],
-            cwd=project,
-            check=True,
-            capture_output=True,
+        init_repo(
+            project,
+            BUN_PROJECT_FILES,
+            name="Nix Develop Test",
+            email="test@nixdev.test",
         )
 
         yield project
     finally:
-        # Clean up temp directory
-        shutil.rmtree(project, ignore_errors=True)
+        # Clean up temp directory (may hold a large nix result tree)
+        rmtree_in_background(project)
 
 
 @pytest.fixture
@@ -147,54 +134,25 @@ def minimal_flake_project() -> Path:
     project = Path(tempfile.mkdtemp(prefix="nix-min-", dir="/tmp"))
 
     try:
-        # Initialize git repo with config
-        subprocess.run(
-            ["git", "init"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.email", "test@nixdev.test"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Nix Develop Test"],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-
-        # Create minimal flake.nix (no cowsay)
-        (project / "flake.nix").write_text(COWSAY_BASE_FLAKE_NIX)
-
-        # Create README
-        (project / "README.md").write_text("# Nix Develop Minimal Test Project\n")
-
-        # Initial commit
-        subprocess.run(
-            ["git", "add", "."],
-            cwd=project,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Initial commit"],
-            cwd=project,
-            check=True,
-            capture_output=True,
+        init_repo(
+            project,
+            COWSAY_BASE_PROJECT_FILES,
+            name="Nix Develop Test",
+            email="test@nixdev.test",
         )
 
         yield project
     finally:
-        # Clean up temp directory
-        shutil.rmtree(project, ignore_errors=True)
+        # Clean up temp directory (may hold a large nix result tree)
+        rmtree_in_background(project)
 
 
 @pytest.mark.slow
 @pytest.mark.timeout(300)
+@pytest.mark.skipif(not HAS_NIX, reason="nix not found on PATH")
+@pytest.mark.skipif(
+    not HAS_API_KEY, reason="CLAUDE_CODE_OAUTH_TOKEN or ANTHROPIC_API_KEY not set"
+)
 class TestNixDevelopIntegration:
     """Integration tests for nix develop environment feature."""
 
@@ -238,7 +196,7 @@ class TestNixDevelopIntegration:
             if event.get("event") != "completed":
                 log_path = orchestrator.get_task_logs(task_id).get("log_path")
                 if log_path and Path(log_path).exists():
-                    log_content = Path(log_path).read_text()[-5000:]  # Last 5k chars
+                    log_content = read_tail(log_path, 5000)  # Last 5k bytes
                     pytest.fail(f"Task failed. Event: {event}\nLogs (last 5k):\n{log_content}")
 
             # Verify completion
@@ -249,23 +207,21 @@ class TestNixDevelopIntegration:
             version_file = repo_path / "version.txt"
             if not version_file.exists():
                 # Show what's in the repo for debugging
-                files = list(repo_path.rglob("*"))
                 result_json = repo_path.parent / "result.json"
                 result_content = result_json.read_text() if result_json.exists() else "not found"
                 log_path = orchestrator.get_task_logs(task_id).get("log_path")
-                log_content = Path(log_path).read_text()[-3000:] if log_path and Path(log_path).exists() else "not found"
+                log_content = read_tail(log_path, 3000) if log_path and Path(log_path).exists() else "not found"
                 pytest.fail(
                     f"Expected {version_file} to exist\n"
-                    f"Files in repo: {[str(f.relative_to(repo_path)) for f in files if f.is_file()]}\n"
+                    f"Files in repo: {sample_tree(repo_path)}\n"
                     f"result.json: {result_content}\n"
                     f"Logs (last 3k):\n{log_content}"
                 )
 
             # Verify version format (e.g., "1.0.23")
             version_content = version_file.read_text()
-            version_pattern = r"\d+\.\d+\.\d+"
-            if not re.search(version_pattern, version_content):
-                pytest.fail(f"Expected version pattern {version_pattern} in version.txt, got: {version_content}")
+            if not VERSION_RE.search(version_content):
+                pytest.fail(f"Expected version pattern {VERSION_RE.pattern} in version.txt, got: {version_content}")
 
         finally:
             # Always cleanup
@@ -304,7 +260,7 @@ class TestNixDevelopIntegration:
             if event.get("event") != "completed":
                 log_path = orchestrator.get_task_logs(task_id).get("log_path")
                 if log_path and Path(log_path).exists():
-                    log_content = Path(log_path).read_text()[-5000:]  # Last 5k chars
+                    log_content = read_tail(log_path, 5000)  # Last 5k bytes
                     pytest.fail(f"Task failed. Event: {event}\nLogs (last 5k):\n{log_content}")
 
             # Verify completion
@@ -322,14 +278,13 @@ class TestNixDevelopIntegration:
             cowsay_file = repo_path / "cowsay.txt"
             if not cowsay_file.exists():
                 # Show what's in the repo for debugging
-                files = list(repo_path.rglob("*"))
                 result_json = repo_path.parent / "result.json"
                 result_content = result_json.read_text() if result_json.exists() else "not found"
                 log_path = orchestrator.get_task_logs(task_id).get("log_path")
-                log_content = Path(log_path).read_text()[-3000:] if log_path and Path(log_path).exists() else "not found"
+                log_content = read_tail(log_path, 3000) if log_path and Path(log_path).exists() else "not found"
                 pytest.fail(
                     f"Expected {cowsay_file} to exist\n"
-                    f"Files in repo: {[str(f.relative_to(repo_path)) for f in files if f.is_file()]}\n"
+                    f"Files in repo: {sample_tree(repo_path)}\n"
                     f"result.json: {result_content}\n"
                     f"Logs (last 3k):\n{log_content}"
                 )
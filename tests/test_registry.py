@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 
 import pytest
@@ -327,6 +328,60 @@ class TestEdgeCases:
         assert alias == "my-project"
 
 
+# =============================================================================
+# Batch Tests
+# =============================================================================
+
+
+class TestBatch:
+    """Tests for grouping registry changes into one write."""
+
+    def test_batch_defers_write_until_exit(
+        self, registry: RepoRegistry, git_repo: Path, git_repo_b: Path
+    ):
+        """Changes inside batch() are visible at once but written on exit."""
+        with registry.batch():
+            registry.allow(git_repo, alias="a")
+            registry.allow(git_repo_b, alias="b")
+            registry.remove("a")
+
+            assert registry.list().keys() == {"b"}
+            assert not registry.registry_path.exists()
+
+        data = json.loads(registry.registry_path.read_text())
+        assert data.keys() == {"b"}
+
+    def test_nested_batch_writes_once_at_outermost_exit(
+        self, registry: RepoRegistry, git_repo: Path, git_repo_b: Path
+    ):
+        """An inner batch() exit does not write; the outer one does."""
+        with registry.batch():
+            with registry.batch():
+                registry.allow(git_repo, alias="a")
+            assert not registry.registry_path.exists()
+            registry.allow(git_repo_b, alias="b")
+
+        data = json.loads(registry.registry_path.read_text())
+        assert data.keys() == {"a", "b"}
+
+    def test_batch_without_changes_does_not_write(self, registry: RepoRegistry):
+        """An empty batch() leaves the registry file untouched."""
+        with registry.batch():
+            pass
+
+        assert not registry.registry_path.exists()
+
+    def test_batch_writes_on_error(self, registry: RepoRegistry, git_repo: Path):
+        """Changes made before an exception are still persisted."""
+        with pytest.raises(UnknownRepoError):
+            with registry.batch():
+                registry.allow(git_repo, alias="a")
+                registry.remove("missing")
+
+        data = json.loads(registry.registry_path.read_text())
+        assert data.keys() == {"a"}
+
+
 # =============================================================================
 # Persistence Tests
 # =============================================================================
@@ -347,6 +402,68 @@ class TestPersistence:
         result = registry2.resolve("my-project")
         assert result == git_repo.resolve()
 
+    def test_load_sees_external_edit(self, registry: RepoRegistry, git_repo: Path):
+        """A file changed by another writer is parsed again."""
+        registry.allow(git_repo)
+        registry.registry_path.write_text(
+            json.dumps({"other": {"path": "/other", "added": "2024-01-01T00:00:00+00:00"}})
+        )
+
+        registry2 = RepoRegistry(registry_path=registry.registry_path)
+
+        assert list(registry2.list()) == ["other"]
+
+    def test_persist_skips_unchanged_state(self, registry: RepoRegistry, git_repo: Path):
+        """Persisting the state already on disk leaves the file alone."""
+        registry.allow(git_repo)
+        inode = registry.registry_path.stat().st_ino
+
+        registry._persist()
+
+        # Every real write renames a fresh file into place
+        assert registry.registry_path.stat().st_ino == inode
+
+    def test_persist_overwrites_external_edit(
+        self, registry: RepoRegistry, git_repo: Path
+    ):
+        """An externally edited file is rewritten even if memory is unchanged."""
+        registry.allow(git_repo)
+        registry.registry_path.write_text("{}")
+
+        registry._persist()
+
+        assert json.loads(registry.registry_path.read_text()) == registry.list()
+        assert not list(registry.registry_path.parent.glob(".*.tmp"))
+
+    def test_persist_writes_through_symlink(self, tmp_path: Path, git_repo: Path):
+        """A symlinked registry keeps its link and the target gets the update."""
+        target = tmp_path / "dotfiles" / "allowed-repos.json"
+        target.parent.mkdir()
+        target.write_text("{}")
+        link = tmp_path / "allowed-repos-link.json"
+        link.symlink_to(target)
+
+        RepoRegistry(registry_path=link).allow(git_repo)
+
+        assert link.is_symlink()
+        assert "my-project" in json.loads(target.read_text())
+        assert not list(target.parent.glob(".*.tmp"))
+
+    def test_persist_overwrites_same_size_edit(
+        self, registry: RepoRegistry, git_repo: Path
+    ):
+        """A same-size external edit with an unchanged mtime is still rewritten."""
+        registry.allow(git_repo)
+        path = registry.registry_path
+        st = path.stat()
+        added = registry.list()["my-project"]["added"]
+        path.write_text(path.read_text().replace(added, "2000-01-01T00:00:00.000000+00:00"))
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        registry._persist()
+
+        assert json.loads(path.read_text()) == registry.list()
+
     def test_load_handles_missing_file(self, tmp_path: Path):
         """No file means empty registry, no error."""
         registry = RepoRegistry(registry_path=tmp_path / "nonexistent.json")
@@ -282,6 +282,13 @@ class TestVMProcess:
             assert cmd[1] == "-c"
             assert isinstance(cmd[2], str)  # The patched script content
 
+            # Stop the monitor thread before pty_mock closes the real fds
+            # it is reading, or its cleanup could close a reused fd number
+            process.stop()
+            pty_mock.hangup()
+            process._thread.join(timeout=5)
+            assert not process._thread.is_alive()
+
     def test_vmprocess_stop(self, vm_config: VMConfig, vm_task: Task, popen_mock):
         """Terminates process cleanly."""
         process = VMProcess(vm_task, vm_config)